@@ -0,0 +1,158 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import build_model
+from diagrama_facil.generators import (
+    FragmentMemo,
+    generate_logical_model,
+    generate_plantuml_diagram,
+    generate_sql,
+)
+from diagrama_facil.model import Attribute
+
+GENERATORS = {
+    "generate_sql": generate_sql,
+    "generate_plantuml_diagram": generate_plantuml_diagram,
+    "generate_logical_model": generate_logical_model,
+}
+
+
+# `setup` roda antes de cada repetição, fora da medição
+def _time(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _peak_memory(func, setup=None):
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _result(name, size, timings, peak, output):
+    return {
+        "name": name,
+        "entities": size,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_bytes": peak,
+        "output_bytes": len(output.encode("utf-8")),
+    }
+
+
+def run_size(size, args):
+    def new_model():
+        return build_model(
+            entities=size,
+            attributes_per_entity=args.attributes,
+            weak_ratio=args.weak_ratio,
+            subtype_ratio=args.subtype_ratio,
+            multivalued_ratio=args.multivalued_ratio,
+            relationships=int(size * args.relationship_factor),
+            seed=args.seed,
+        )
+
+    model = new_model()
+    results = []
+    for name, generator in GENERATORS.items():
+        run = lambda: generator(model.entities, model.relationships)
+        output = run()
+        results.append(_result(name, size, _time(run, args.repeat), _peak_memory(run), output))
+
+        # Regeração após alterar um único atributo, reaproveitando os fragmentos memoizados
+        edited = new_model()
+        target = next(iter(edited.entities))
+        edited.add_attribute(target, Attribute("extra", "DATE"))
+        memo = FragmentMemo()
+        generator(edited.entities, edited.relationships, memo)
+        data_types = itertools.cycle(("TIMESTAMP", "DATE"))
+
+        # A alteração fica fora da medição e só troca o tipo de "extra", para o modelo não crescer entre repetições
+        def edit():
+            attributes = edited.entities[target].attributes
+            edited.set_attributes(target, attributes[:-1] + [Attribute("extra", next(data_types))])
+
+        def incremental():
+            return generator(edited.entities, edited.relationships, memo)
+
+        edit()
+        output = incremental()
+        results.append(_result(f"{name}[incremental]", size, _time(incremental, args.repeat, edit), _peak_memory(incremental, edit), output))
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Compara com um resultado anterior: razão entre medianas (> 1 significa mais lento agora)
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["entities"]): r for r in json.load(f)["results"]}
+    for r in results:
+        previous = baseline.get((r["name"], r["entities"]))
+        if previous:
+            ratio = r["median_s"] / previous["median_s"] if previous["median_s"] else float("inf")
+            print(f"{r['name']:<40} {r['entities']:>6}  {ratio:6.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho dos geradores com modelos ER sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="quantidades de entidades")
+    parser.add_argument("--attributes", type=int, default=8, help="atributos por entidade")
+    parser.add_argument("--weak-ratio", type=float, default=0.1)
+    parser.add_argument("--subtype-ratio", type=float, default=0.1)
+    parser.add_argument("--multivalued-ratio", type=float, default=0.05)
+    parser.add_argument("--relationship-factor", type=float, default=1.5, help="relacionamentos por entidade")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args))
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
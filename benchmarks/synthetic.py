@@ -0,0 +1,49 @@
+import random
+
+from diagrama_facil.model import Attribute, ERModel, Relationship
+
+DATA_TYPES = ["VARCHAR2(255)", "NUMBER", "DATE", "CHAR(1)", "CLOB"]
+
+
+# Gera um modelo ER sintético e reprodutível (mesma semente, mesmo modelo)
+def build_model(entities=100, attributes_per_entity=8, weak_ratio=0.1, subtype_ratio=0.1,
+                multivalued_ratio=0.05, relationships=150, relationship_mix=(1, 3, 1), seed=0):
+    rng = random.Random(seed)
+    model = ERModel()
+    names = []
+    for i in range(entities):
+        name = f"tabela_{i}"
+        is_weak = rng.random() < weak_ratio
+        # Subtipos sempre especializam uma entidade já criada, formando árvores de generalização
+        supertype = rng.choice(names) if names and rng.random() < subtype_ratio else None
+        model.add_entity(name, is_weak=is_weak, supertype=supertype)
+        model.add_attribute(name, Attribute(f"id_{name}", "NUMBER", is_primary_key=True))
+        if is_weak:
+            model.add_attribute(name, Attribute(f"seq_{name}", "NUMBER", is_primary_key=True))
+        for j in range(attributes_per_entity - 1):
+            is_foreign_key = bool(names) and rng.random() < 0.1
+            references = rng.choice(names) if is_foreign_key else None
+            model.add_attribute(name, Attribute(
+                f"atributo_{j}",
+                rng.choice(DATA_TYPES),
+                is_foreign_key=is_foreign_key,
+                is_multivalued=not is_foreign_key and rng.random() < multivalued_ratio,
+                is_derived=rng.random() < 0.02,
+                references=references,
+                referenced_attr=f"id_{references}" if references else None,
+            ))
+        names.append(name)
+
+    types = ["1:1", "1:N", "N:N"]
+    if len(names) >= 2:
+        for k in range(relationships):
+            entity1, entity2 = rng.sample(names, 2)
+            model.add_relationship(Relationship(
+                entity1,
+                entity2,
+                f"rel_{k}",
+                rng.choices(types, weights=relationship_mix)[0],
+                participation=rng.choice(["Total", "Parcial"]),
+                participation2=rng.choice(["Total", "Parcial"]),
+            ))
+    return model
@@ -0,0 +1,2 @@
+# Módulos de apoio do Diagrama Fácil (geração, renderização e cache),
+# independentes do Streamlit para poderem ser usados fora da interface.
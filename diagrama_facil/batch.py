@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from diagrama_facil.generators import write_logical_model, write_plantuml_diagram, write_sql
+from diagrama_facil.persistence import read_model
+from diagrama_facil.render_backend import backend_from_config
+
+MODEL_EXTENSIONS = (".dfz", ".json", ".gz")
+
+# Renderizador do processo worker, criado uma vez pelo initializer do pool
+_backend = None
+
+
+def _init_worker(render_config):
+    global _backend
+    _backend = backend_from_config(render_config) if render_config is not None else None
+
+
+def find_models(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(MODEL_EXTENSIONS)
+    )
+
+
+def _artifact_name(path):
+    name = os.path.basename(path)
+    for ext in (".gz", ".json", ".dfz"):
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+    return name
+
+
+# Gera todos os artefatos de um arquivo de modelo; nunca levanta exceção, registra o erro
+def process_model(path, output_dir):
+    name = _artifact_name(path)
+    timings = {}
+    outputs = []
+    result = {"model": path, "ok": True, "timings": timings, "outputs": outputs}
+    stage = "load"
+    try:
+        start = time.perf_counter()
+        model = read_model(path)
+        timings["load"] = time.perf_counter() - start
+        target = os.path.join(output_dir, name)
+        os.makedirs(target, exist_ok=True)
+        for stage, file_name, writer in (
+            ("sql", f"{name}.sql", write_sql),
+            ("plantuml", f"{name}.puml", write_plantuml_diagram),
+            ("logical_model", f"{name}.md", write_logical_model),
+        ):
+            start = time.perf_counter()
+            out_path = os.path.join(target, file_name)
+            with open(out_path, "w", encoding="utf-8") as f:
+                writer(f, model.entities, model.relationships)
+            timings[stage] = time.perf_counter() - start
+            outputs.append(out_path)
+        if _backend is not None:
+            stage = "render"
+            start = time.perf_counter()
+            # Reaproveita o .puml já gravado em vez de gerar o diagrama de novo
+            with open(outputs[1], encoding="utf-8") as f:
+                image = _backend.render(f.read())
+            out_path = os.path.join(target, f"{name}.{_backend.output_format}")
+            with open(out_path, "wb") as f:
+                f.write(image)
+            timings["render"] = time.perf_counter() - start
+            outputs.append(out_path)
+    except Exception as e:
+        result["ok"] = False
+        result["stage"] = stage
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["total"] = sum(timings.values())
+    return result
+
+
+def run_batch(paths, output_dir, workers=None, render_config=None):
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(render_config,)) as pool:
+        futures = [pool.submit(process_model, path, output_dir) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "ok" if result["ok"] else f"ERRO ({result['stage']}): {result['error']}"
+            print(f"{result['model']}: {result['total']:.3f}s {status}", file=sys.stderr)
+            results.append(result)
+    results.sort(key=lambda r: r["model"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera SQL, PlantUML, modelo lógico e diagramas para vários modelos em paralelo.")
+    parser.add_argument("models", help="diretório com arquivos de modelo (.dfz, .json, .gz)")
+    parser.add_argument("-o", "--output", default="artefatos", help="diretório de saída")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processos em paralelo (padrão: núcleos da CPU)")
+    parser.add_argument("--no-render", action="store_true", help="não renderizar as imagens dos diagramas")
+    parser.add_argument("--renderer", choices=["kroki", "plantuml-jar"], help="sobrepõe DIAGRAM_RENDERER")
+    parser.add_argument("--kroki-url", help="sobrepõe KROKI_URL")
+    parser.add_argument("--report", help="arquivo JSON com tempos e erros (padrão: <saída>/relatorio.json)")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.models):
+        parser.error(f"diretório de modelos não encontrado: {args.models}")
+
+    render_config = None
+    if not args.no_render:
+        # Apenas as variáveis de configuração do renderizador vão para os workers
+        render_config = {key: value for key, value in os.environ.items() if key.startswith(("DIAGRAM_", "KROKI_", "PLANTUML_"))}
+        if args.renderer:
+            render_config["DIAGRAM_RENDERER"] = args.renderer
+        if args.kroki_url:
+            render_config["KROKI_URL"] = args.kroki_url
+        # Valida a configuração uma vez aqui: um erro no initializer derrubaria o pool inteiro
+        try:
+            backend_from_config(render_config).close()
+        except ValueError as e:
+            print(f"Configuração do renderizador inválida: {e}", file=sys.stderr)
+            return 2
+
+    paths = find_models(args.models)
+    if not paths:
+        print(f"Nenhum arquivo de modelo encontrado em {args.models}.", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+    start = time.perf_counter()
+    results = run_batch(paths, args.output, args.workers, render_config)
+    failed = [r for r in results if not r["ok"]]
+    report = {
+        "models": len(results),
+        "failed": len(failed),
+        "wall_time": time.perf_counter() - start,
+        "results": results,
+    }
+    report_path = args.report or os.path.join(args.output, "relatorio.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"{len(results) - len(failed)}/{len(results)} modelos processados em {report['wall_time']:.2f}s; relatório em {report_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import argparse
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from diagrama_facil.persistence import read_model
+from diagrama_facil.schema_diff import create_table_sql, schema_from_model
+
+DIALECTS = ("oracle", "sqlite")
+
+
+class ApplyError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class DDLPlan:
+    """Script DDL organizado em níveis de dependência.
+
+    As tabelas de um nível só referenciam tabelas de níveis anteriores, então
+    os comandos de um mesmo nível podem ser executados em paralelo. As FKs
+    que fecham ciclos ficam em `deferred` e são aplicadas numa última etapa.
+    """
+
+    dialect: str
+    sequences: list = field(default_factory=list)
+    levels: list = field(default_factory=list)
+    deferred: list = field(default_factory=list)
+
+    # Etapas de execução: sequências e nível 0 juntos, demais níveis, FKs adiadas
+    @property
+    def waves(self):
+        waves = [list(self.sequences) + [sql for _, sql in self.levels[0]]] if self.levels else [list(self.sequences)]
+        waves.extend([sql for _, sql in level] for level in self.levels[1:])
+        if self.deferred:
+            waves.append(list(self.deferred))
+        return [wave for wave in waves if wave]
+
+    def to_sql(self):
+        parts = list(self.sequences)
+        for i, level in enumerate(self.levels):
+            parts.append(f"-- Nível {i} ({len(level)} tabela(s))")
+            parts.extend(sql for _, sql in level)
+        if self.deferred:
+            parts.append("-- Chaves estrangeiras adiadas (ciclos)")
+            parts.extend(self.deferred)
+        return "\n".join(parts)
+
+
+# Componentes fortemente conexos (Tarjan iterativo); devolve o índice do componente de cada nó
+def _strongly_connected(graph):
+    index = {}
+    low = {}
+    component = {}
+    stack = []
+    on_stack = set()
+    counter = 0
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, edges = work[-1]
+            for target in edges:
+                if target not in index:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(graph[target])))
+                    break
+                if target in on_stack:
+                    low[node] = min(low[node], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = node
+                        if member == node:
+                            break
+    return component
+
+
+def dependency_levels(schema):
+    """Agrupa as tabelas em níveis pelo grafo de chaves estrangeiras.
+
+    FKs entre tabelas do mesmo componente fortemente conexo (ciclos) não
+    contam como dependência e são devolvidas à parte, como adiadas.
+    Devolve (níveis, adiadas), com adiadas no formato (tabela, fk).
+    """
+    graph = {name: [] for name in schema.tables}
+    for name, table in schema.tables.items():
+        for fk in table.foreign_keys:
+            if fk.ref_table in graph and fk.ref_table != name:
+                graph[name].append(fk.ref_table)
+    component = _strongly_connected(graph)
+
+    deferred = []
+    depends = {name: set() for name in graph}
+    for name, table in schema.tables.items():
+        for fk in table.foreign_keys:
+            target = fk.ref_table
+            if target not in graph or target == name:
+                continue  # tabela externa ou autorreferência: fica na própria tabela
+            if component[target] == component[name]:
+                deferred.append((name, fk))
+            else:
+                depends[name].add(target)
+
+    # Ordenação topológica por camadas (Kahn), preservando a ordem do modelo em cada nível
+    dependents = {name: [] for name in graph}
+    remaining = {}
+    for name, targets in depends.items():
+        remaining[name] = len(targets)
+        for target in targets:
+            dependents[target].append(name)
+    order = {name: i for i, name in enumerate(graph)}
+    level = [name for name in graph if remaining[name] == 0]
+    levels = []
+    while level:
+        levels.append(level)
+        following = []
+        for name in level:
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    following.append(dependent)
+        level = sorted(following, key=order.__getitem__)
+    return levels, deferred
+
+
+def _fk_clause(fk, deferred=False):
+    clause = f"FOREIGN KEY ({', '.join(fk.columns)}) REFERENCES {fk.ref_table}({', '.join(fk.ref_columns)})"
+    if deferred:
+        clause += " DEFERRABLE INITIALLY DEFERRED"
+    return clause
+
+
+# Toda FK recebe nome, para que as migrações de schema_diff possam removê-la depois
+def _inline_fk_sql(table_name, fk, deferred=False):
+    return f"    CONSTRAINT {fk.constraint_name(table_name)} {_fk_clause(fk, deferred)}"
+
+
+def _create_table_sql(table, foreign_keys, deferred_fks=()):
+    constraints = [_inline_fk_sql(table.name, fk) for fk in foreign_keys]
+    constraints.extend(_inline_fk_sql(table.name, fk, deferred=True) for fk in deferred_fks)
+    return create_table_sql(table, constraints)
+
+
+def plan_ddl(model, dialect="oracle"):
+    """Monta o DDL do modelo em níveis de dependência.
+
+    No Oracle as FKs adiadas viram ALTER TABLE ao final. O SQLite não aceita
+    ADD CONSTRAINT, mas permite referenciar tabelas ainda não criadas; nele
+    as FKs adiadas ficam na própria tabela como DEFERRABLE INITIALLY DEFERRED.
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Dialeto desconhecido: {dialect}")
+    schema = schema_from_model(model)
+    levels, deferred = dependency_levels(schema)
+    deferred_by_table = {}
+    for name, fk in deferred:
+        deferred_by_table.setdefault(name, []).append(fk)
+
+    plan = DDLPlan(dialect)
+    if dialect == "oracle":
+        plan.sequences = list(schema.sequences.values())
+    for level in levels:
+        statements = []
+        for name in level:
+            table = schema.tables[name]
+            postponed = deferred_by_table.get(name, [])
+            inline = [fk for fk in table.foreign_keys if all(fk is not other for other in postponed)]
+            statements.append((name, _create_table_sql(table, inline, postponed if dialect == "sqlite" else ())))
+        plan.levels.append(statements)
+    if dialect == "oracle":
+        for name, fk in deferred:
+            plan.deferred.append(f"ALTER TABLE {name} ADD CONSTRAINT {fk.constraint_name(name)} {_fk_clause(fk, deferred=True)};")
+    return plan
+
+
+@dataclass(slots=True)
+class WaveTiming:
+    wave: int
+    statements: int
+    seconds: float
+
+
+def apply_plan(plan, connect, max_workers=8, begin=None):
+    """Executa as etapas do plano em ordem, com os comandos de cada etapa em paralelo.
+
+    `connect` cria uma conexão DB-API. Cada etapa é dividida em até
+    `max_workers` lotes, cada um executado numa conexão própria e confirmado
+    de uma vez (`begin` abre a transação explicitamente, se o banco exigir).
+    Uma etapa só começa quando a anterior termina. Devolve o tempo de cada etapa.
+    """
+    def execute(statements):
+        connection = connect()
+        try:
+            cursor = connection.cursor()
+            if begin:
+                cursor.execute(begin)
+            for sql in statements:
+                try:
+                    # Drivers DB-API não aceitam o ";" final
+                    cursor.execute(sql.strip().rstrip(";"))
+                except Exception as e:
+                    raise ApplyError(f"{e}\n{sql}") from e
+            connection.commit()
+        finally:
+            connection.close()
+
+    timings = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, wave in enumerate(plan.waves):
+            start = time.perf_counter()
+            batches = [wave[j::max_workers] for j in range(min(max_workers, len(wave)))]
+            errors = []
+            for future in [pool.submit(execute, batch) for batch in batches]:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(str(e))
+            if errors:
+                raise ApplyError(f"Falha na etapa {i} ({len(errors)} de {len(batches)} lotes):\n" + "\n\n".join(errors))
+            timings.append(WaveTiming(i, len(wave), time.perf_counter() - start))
+    return timings
+
+
+def sqlite_connector(path):
+    # O SQLite aceita um escritor por vez; o tempo de espera cobre os lotes que aguardam o lock
+    def connect():
+        return sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+    return connect
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o DDL de um modelo em níveis de dependência e, opcionalmente, aplica em paralelo.")
+    parser.add_argument("model", help="arquivo de modelo (.dfz, .json, .gz)")
+    parser.add_argument("--dialect", choices=DIALECTS, default=None, help="dialeto do DDL (padrão: oracle, ou sqlite com --apply)")
+    parser.add_argument("--apply", metavar="BANCO", help="aplica o DDL num banco SQLite local")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="lotes em paralelo por etapa (o SQLite serializa as escritas; valores maiores só ajudam em bancos servidor)")
+    args = parser.parse_args(argv)
+
+    dialect = args.dialect or ("sqlite" if args.apply else "oracle")
+    if args.apply and dialect != "sqlite":
+        parser.error("--apply só é suportado com o dialeto sqlite")
+    plan = plan_ddl(read_model(args.model), dialect)
+    if not args.apply:
+        print(plan.to_sql())
+        return 0
+    try:
+        timings = apply_plan(plan, sqlite_connector(args.apply), args.workers, begin="BEGIN IMMEDIATE")
+    except ApplyError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for timing in timings:
+        print(f"etapa {timing.wave}: {timing.statements} comandos em {timing.seconds:.3f}s", file=sys.stderr)
+    print(f"{len(timings)} etapas em {sum(t.seconds for t in timings):.3f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
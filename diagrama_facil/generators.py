@@ -0,0 +1,291 @@
+class FragmentMemo:
+    """Memoiza fragmentos gerados por entidade e por relacionamento.
+
+    Cada fragmento é guardado junto da versão que o produziu; se a versão
+    atual for a mesma, o fragmento é reaproveitado sem ser regenerado.
+    """
+
+    def __init__(self):
+        self._fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, build):
+        entry = self._fragments.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        self._fragments[key] = (version, value)
+        return value
+
+    # Descarta fragmentos de entidades/relacionamentos que não existem mais
+    def prune(self, kind, live_keys):
+        live_keys = set(live_keys)
+        for key in [key for key in self._fragments if key[0] == kind and key not in live_keys]:
+            del self._fragments[key]
+
+
+# Versão de um fragmento de relacionamento: depende também das duas entidades (tipo/nome da PK)
+def _relationship_version(rel, entities):
+    return (rel.version, entities[rel.entity1].version, entities[rel.entity2].version)
+
+
+def _memoized(memo, key, version, build):
+    if memo is None:
+        return build()
+    return memo.get(key, version, build)
+
+
+# Nome das FKs sem nome próprio; o mesmo no script completo, no DDL ordenado e nas migrações
+def fk_constraint_name(table, columns):
+    return f"fk_{table}_{'_'.join(columns)}"
+
+
+# Sequência da chave primária numérica da entidade (ou None)
+def entity_sequence_sql(entity_name, entity):
+    # Criar sequência para chave primária se for numérica
+    for attr in entity.pk_attributes:
+        if attr.data_type.upper() in ('NUMBER', 'INT', 'INTEGER'):
+            sequence_name = f"{entity_name}_{attr.name}_seq"
+            return f"CREATE SEQUENCE {sequence_name} START WITH 1 INCREMENT BY 1 NOCACHE NOCYCLE;"  # Considerando apenas uma sequência por tabela
+    return None
+
+
+# Fragmento SQL de uma entidade: tabelas dos multivalorados seguidas do CREATE TABLE principal
+def entity_sql(entity_name, entity):
+    statements = []
+    is_weak = entity.is_weak
+    pk_attrs = [attr.name for attr in entity.pk_attributes]
+    # Entidades fracas e PKs de mais de um atributo usam a restrição no nível da tabela
+    composite_pk = is_weak or len(pk_attrs) > 1
+    columns = []
+    fk_statements = []
+    for attr in entity.attributes:
+        if attr.is_multivalued:
+            # Em Oracle, atributos multivalorados podem ser modelados em tabelas separadas
+            multivalued_table = f"{entity_name}_{attr.name}"
+            statements.append(
+                f"CREATE TABLE {multivalued_table} (\n"
+                f"    {entity_name}_id {entity.primary_key_type},\n"
+                f"    {attr.name} {attr.data_type},\n"
+                f"    CONSTRAINT {fk_constraint_name(multivalued_table, [f'{entity_name}_id'])} "
+                f"FOREIGN KEY ({entity_name}_id) REFERENCES {entity_name}({pk_attrs[0]})\n"
+                ");\n"
+            )
+            continue  # Não incluir o atributo na tabela principal
+        if attr.is_derived:
+            # Atributos derivados não são armazenados no banco, podem ser calculados via VIEW
+            continue
+        if attr.is_primary_key and not composite_pk:
+            columns.append(f"    {attr.name} {attr.data_type} PRIMARY KEY")
+        else:
+            columns.append(f"    {attr.name} {attr.data_type}")
+        if attr.is_foreign_key:
+            fk_statements.append(
+                f"CONSTRAINT {fk_constraint_name(entity_name, [attr.name])} "
+                f"FOREIGN KEY ({attr.name}) REFERENCES {attr.references}({attr.referenced_attr})"
+            )
+    # Remover a última vírgula
+    parts = [(f"CREATE TABLE {entity_name} (\n" + ",\n".join(columns)).rstrip(",\n") + "\n"]
+    if composite_pk:
+        parts.append(f",    PRIMARY KEY ({', '.join(pk_attrs)})\n")
+    if fk_statements:
+        parts.append(",\n    " + ",\n    ".join(fk_statements) + "\n")
+    parts.append(");\n")
+    statements.append("".join(parts))
+    return statements
+
+
+# Fragmento SQL de um relacionamento (ALTER TABLE ou tabela associativa)
+def relationship_sql(rel, entities):
+    if rel.relationship_type == "1:N":
+        # Adicionar FK na tabela "N"
+        fk_attr = f"{rel.entity1}_id"
+        return (
+            f"ALTER TABLE {rel.entity2} ADD ({fk_attr} {entities[rel.entity1].primary_key_type});\n"
+            f"ALTER TABLE {rel.entity2} ADD CONSTRAINT fk_{rel.entity2}_{rel.entity1} FOREIGN KEY ({fk_attr}) REFERENCES {rel.entity1}({entities[rel.entity1].primary_key});\n"
+        )
+    elif rel.relationship_type == "N:N":
+        # Criar tabela associativa
+        assoc_table = f"{rel.entity1}_{rel.entity2}"
+        pk1 = entities[rel.entity1].primary_key
+        pk2 = entities[rel.entity2].primary_key
+        pk1_type = entities[rel.entity1].primary_key_type
+        pk2_type = entities[rel.entity2].primary_key_type
+        return (
+            f"CREATE TABLE {assoc_table} (\n"
+            f"    {rel.entity1}_id {pk1_type},\n"
+            f"    {rel.entity2}_id {pk2_type},\n"
+            f"    PRIMARY KEY ({rel.entity1}_id, {rel.entity2}_id),\n"
+            f"    CONSTRAINT {fk_constraint_name(assoc_table, [f'{rel.entity1}_id'])} FOREIGN KEY ({rel.entity1}_id) REFERENCES {rel.entity1}({pk1}),\n"
+            f"    CONSTRAINT {fk_constraint_name(assoc_table, [f'{rel.entity2}_id'])} FOREIGN KEY ({rel.entity2}_id) REFERENCES {rel.entity2}({pk2})\n"
+            ");\n"
+        )
+    elif rel.relationship_type == "1:1":
+        # Em relacionamentos 1:1, a chave estrangeira pode ficar em qualquer tabela
+        fk_attr = f"{rel.entity1}_id"
+        return (
+            f"ALTER TABLE {rel.entity2} ADD ({fk_attr} {entities[rel.entity1].primary_key_type} UNIQUE);\n"
+            f"ALTER TABLE {rel.entity2} ADD CONSTRAINT fk_{rel.entity2}_{rel.entity1} FOREIGN KEY ({fk_attr}) REFERENCES {rel.entity1}({entities[rel.entity1].primary_key});\n"
+        )
+    return None
+
+
+# Emite os comandos SQL (padrão Oracle) um a um: sequências, tabelas e relacionamentos
+def iter_sql(entities, relationships, memo=None):
+    for entity_name, entity in entities.items():
+        sequence_sql = entity_sequence_sql(entity_name, entity)
+        if sequence_sql:
+            yield sequence_sql
+    live_keys = []
+    for entity_name, entity in entities.items():
+        key = ('sql', entity_name)
+        live_keys.append(key)
+        yield from _memoized(memo, key, entity.version, lambda: entity_sql(entity_name, entity))
+
+    # Adicionar relacionamentos
+    for rel in relationships:
+        key = ('sql',) + rel.key
+        live_keys.append(key)
+        fk_sql = _memoized(memo, key, _relationship_version(rel, entities), lambda: relationship_sql(rel, entities))
+        if fk_sql:
+            yield fk_sql
+    if memo is not None:
+        memo.prune('sql', live_keys)
+
+
+# Função para gerar SQL no padrão Oracle
+def generate_sql(entities, relationships, memo=None):
+    return "\n".join(iter_sql(entities, relationships, memo))
+
+
+PLANTUML_HEADER = "@startuml\n!define ER_TOP_DOWN\n' Configurações de estilo\nhide circle\nskinparam linetype ortho\n"
+
+
+# Fragmento PlantUML de uma entidade
+def entity_plantuml(entity_name, entity):
+    lines = [f"entity \"{entity_name}\" as {entity_name} {{\n"]
+    for attr in entity.attributes:
+        if attr.is_primary_key:
+            lines.append(f"  * {attr.name} : {attr.data_type}\n")  # Chave primária
+        elif attr.is_foreign_key:
+            lines.append(f"  + {attr.name} : {attr.data_type}\n")  # Chave estrangeira
+        else:
+            lines.append(f"  {attr.name} : {attr.data_type}\n")
+    lines.append("}\n")
+    # Generalização/especialização
+    if entity.supertype:
+        lines.append(f"{entity_name} --|> {entity.supertype}\n")
+    for subtype in entity.subtypes:
+        lines.append(f"{subtype} --|> {entity_name}\n")
+    return "".join(lines)
+
+
+# Fragmento PlantUML de um relacionamento
+def relationship_plantuml(rel):
+    ent1 = rel.entity1
+    ent2 = rel.entity2
+    rel_name = rel.relationship_name
+    rel_type = rel.relationship_type
+    if rel_type == '1:1':
+        return f"{ent1} ||--|| {ent2} : \"{rel_name}\"\n"
+    elif rel_type == '1:N':
+        return f"{ent1} ||--o{{ {ent2} : \"{rel_name}\"\n"
+    elif rel_type == 'N:N':
+        return f"{ent1} }}o--o{{ {ent2} : \"{rel_name}\"\n"
+    return ""
+
+
+# Emite o diagrama PlantUML em blocos (cabeçalho, uma entidade ou relacionamento por vez)
+def iter_plantuml_diagram(entities, relationships, memo=None):
+    yield PLANTUML_HEADER
+    live_keys = []
+    # Definir entidades e seus atributos
+    for entity_name, entity in entities.items():
+        key = ('uml', entity_name)
+        live_keys.append(key)
+        yield _memoized(memo, key, entity.version, lambda: entity_plantuml(entity_name, entity))
+    # Definir relacionamentos
+    for rel in relationships:
+        key = ('uml',) + rel.key
+        live_keys.append(key)
+        yield _memoized(memo, key, rel.version, lambda: relationship_plantuml(rel))
+    if memo is not None:
+        memo.prune('uml', live_keys)
+    yield "@enduml"
+
+
+# Função para gerar diagrama PlantUML
+def generate_plantuml_diagram(entities, relationships, memo=None):
+    return "".join(iter_plantuml_diagram(entities, relationships, memo))
+
+
+# Fragmento do modelo lógico (markdown) de uma entidade
+def entity_logical_model(entity_name, entity):
+    lines = [f"**Tabela `{entity_name}`**\n"]
+    for attr in entity.attributes:
+        details = f"- `{attr.name}` {attr.data_type}"
+        if attr.is_primary_key:
+            details += " (PRIMARY KEY)"
+        if attr.is_foreign_key:
+            details += f" (FOREIGN KEY -> `{attr.references}`)"
+        if attr.is_multivalued:
+            details += " (Multivalorado)"
+        if attr.is_derived:
+            details += " (Derivado)"
+        lines.append(details + "\n")
+    lines.append("\n")
+    return "".join(lines)
+
+
+# Fragmento do modelo lógico de um relacionamento
+def relationship_logical_model(rel):
+    if rel.relationship_type == "1:N":
+        return f"- Chave estrangeira `{rel.entity1}_id` em `{rel.entity2}` referenciando `{rel.entity1}`\n"
+    elif rel.relationship_type == "N:N":
+        return f"- Tabela associativa `{rel.entity1}_{rel.entity2}` com FKs para `{rel.entity1}` e `{rel.entity2}`\n"
+    return ""
+
+
+# Emite o modelo lógico em markdown, uma tabela ou relacionamento por vez
+def iter_logical_model(entities, relationships, memo=None):
+    live_keys = []
+    for entity_name, entity in entities.items():
+        key = ('logical', entity_name)
+        live_keys.append(key)
+        yield _memoized(memo, key, entity.version, lambda: entity_logical_model(entity_name, entity))
+    for rel in relationships:
+        key = ('logical',) + rel.key
+        live_keys.append(key)
+        yield _memoized(memo, key, rel.version, lambda: relationship_logical_model(rel))
+    if memo is not None:
+        memo.prune('logical', live_keys)
+
+
+# Função para gerar o modelo lógico em markdown
+def generate_logical_model(entities, relationships, memo=None):
+    return "".join(iter_logical_model(entities, relationships, memo))
+
+
+# Grava os blocos emitidos direto num arquivo/stream, sem montar a string completa
+def write_chunks(chunks, fp, separator=""):
+    first = True
+    for chunk in chunks:
+        if not first and separator:
+            fp.write(separator)
+        fp.write(chunk)
+        first = False
+
+
+def write_sql(fp, entities, relationships, memo=None):
+    write_chunks(iter_sql(entities, relationships, memo), fp, "\n")
+
+
+def write_plantuml_diagram(fp, entities, relationships, memo=None):
+    write_chunks(iter_plantuml_diagram(entities, relationships, memo), fp)
+
+
+def write_logical_model(fp, entities, relationships, memo=None):
+    write_chunks(iter_logical_model(entities, relationships, memo), fp)
@@ -0,0 +1,493 @@
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.persistence import save_model
+from diagrama_facil.schema_diff import Column, ForeignKey, Schema, Table
+
+FORMATS = ("sql", "csv", "json")
+
+
+class SchemaImportError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class ImportReport:
+    lines: int = 0
+    characters: int = 0
+    statements: int = 0
+    skipped: int = 0
+    tables: int = 0
+    columns: int = 0
+    entities: int = 0
+    relationships: int = 0
+    seconds: float = 0.0
+
+    def summary(self):
+        seconds = self.seconds or 1e-9
+        return (
+            f"{self.entities} entidades e {self.relationships} relacionamentos importados de "
+            f"{self.tables} tabelas ({self.columns} colunas) em {self.seconds:.2f}s: "
+            f"{self.characters / seconds / 1e6:.1f} MB/s, {self.columns / seconds:,.0f} colunas/s"
+            + (f"; {self.skipped} comandos ignorados" if self.skipped else "")
+        )
+
+
+def _counted(lines, report):
+    for line in lines:
+        report.lines += 1
+        report.characters += len(line)
+        yield line
+
+
+# Literais, comentários e terminadores; o resto do texto passa direto
+_LEXER = re.compile(r"'[^']*(?:''[^']*)*'|--|/\*|;")
+
+
+def iter_statements(lines):
+    """Divide um script SQL em comandos, lendo uma linha por vez.
+
+    Ignora comentários (-- e /* */) e não corta em ";" dentro de literais.
+    """
+    parts = []
+    in_comment = False
+    for line in lines:
+        pos = 0
+        if in_comment:
+            end = line.find("*/")
+            if end < 0:
+                continue
+            pos = end + 2
+            in_comment = False
+        while True:
+            match = _LEXER.search(line, pos)
+            if match is None:
+                parts.append(line[pos:])
+                break
+            token = match.group()
+            if token == ";":
+                parts.append(line[pos:match.start()])
+                # Linhas "/" do SQL*Plus ficam no início do comando seguinte
+                statement = "".join(parts).strip().lstrip("/").strip()
+                parts = []
+                if statement:
+                    yield statement
+                pos = match.end()
+            elif token == "--":
+                parts.append(line[pos:match.start()] + "\n")
+                break
+            elif token == "/*":
+                parts.append(line[pos:match.start()] + " ")
+                end = line.find("*/", match.end())
+                if end < 0:
+                    in_comment = True
+                    break
+                pos = end + 2
+            else:
+                parts.append(line[pos:match.end()])
+                pos = match.end()
+    statement = "".join(parts).strip().lstrip("/").strip()
+    if statement:
+        yield statement
+
+
+# Nome sem aspas e sem o prefixo do esquema ("HR"."EMP" -> EMP)
+def _ident(text):
+    return text.strip().split(".")[-1].strip('"')
+
+
+# Só parênteses e vírgulas importam na divisão; o regex salta o resto do texto
+_DELIMITERS = re.compile(r"[(),]")
+
+
+# Divide por vírgulas fora de parênteses
+def _split_top_level(text):
+    items = []
+    depth = 0
+    start = 0
+    for match in _DELIMITERS.finditer(text):
+        char = match.group()
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            items.append(text[start:match.start()])
+            start = match.end()
+    items.append(text[start:])
+    return [item.strip() for item in items if item.strip()]
+
+
+# Conteúdo entre o parêntese em `start` e o seu par
+def _parenthesized(text, start):
+    depth = 0
+    for match in _DELIMITERS.finditer(text, start):
+        char = match.group()
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:match.start()]
+    raise SchemaImportError(f"Parênteses desbalanceados em: {text[:80]}")
+
+
+def _names(text):
+    return tuple(_ident(name) for name in text.split(","))
+
+
+_IDENT = r'(?:"[^"]+"|[\w$#]+)(?:\.(?:"[^"]+"|[\w$#]+))?'
+_CREATE_TABLE = re.compile(rf"CREATE\s+(?:GLOBAL\s+TEMPORARY\s+)?TABLE\s+({_IDENT})\s*\(", re.I)
+_ALTER_ADD = re.compile(rf"ALTER\s+TABLE\s+({_IDENT})\s+ADD\s+", re.I)
+_CREATE_SEQUENCE = re.compile(rf"CREATE\s+SEQUENCE\s+({_IDENT})", re.I)
+_CONSTRAINT = re.compile(r"(?:CONSTRAINT\s+(\S+)\s+)?(PRIMARY\s+KEY|FOREIGN\s+KEY|UNIQUE|CHECK)\b\s*", re.I)
+_REFERENCES = re.compile(rf"REFERENCES\s+({_IDENT})\s*\(([^)]*)\)", re.I)
+_UNIQUE = re.compile(r"\bUNIQUE\b", re.I)
+_PRIMARY_KEY = re.compile(r"\bPRIMARY\s+KEY\b", re.I)
+_COLUMN_OPTIONS = re.compile(
+    r"\b(?:PRIMARY\s+KEY|UNIQUE|NOT\s+NULL|NULL|DEFAULT|REFERENCES|CONSTRAINT|CHECK|GENERATED|ENABLE|DISABLE)\b", re.I
+)
+
+
+def _parse_table_item(table, item):
+    constraint = _CONSTRAINT.match(item)
+    if constraint:
+        name = _ident(constraint.group(1)) if constraint.group(1) else None
+        kind = constraint.group(2).upper().split()[0]
+        rest = item[constraint.end():]
+        if kind == "CHECK":
+            return
+        start = rest.find("(")
+        if start < 0:
+            raise SchemaImportError(f"{kind} sem lista de colunas em {table.name}: {item[:80]}")
+        columns = _names(_parenthesized(rest, start))
+        if kind == "PRIMARY":
+            table.primary_key = columns
+        elif kind == "UNIQUE":
+            if len(columns) == 1 and columns[0] in table.columns:
+                table.columns[columns[0]].unique = True
+        else:
+            references = _REFERENCES.search(rest)
+            if references is None:
+                raise SchemaImportError(f"FOREIGN KEY sem REFERENCES em {table.name}: {item[:80]}")
+            table.foreign_keys.append(ForeignKey(columns, _ident(references.group(1)), _names(references.group(2)), name))
+        return
+
+    # Definição de coluna: nome, tipo (até a primeira opção) e opções
+    name, _, rest = item.partition(" ")
+    name = _ident(name)
+    option = _COLUMN_OPTIONS.search(rest)
+    data_type = (rest[:option.start()] if option else rest).strip()
+    options = rest[option.start():] if option else ""
+    table.columns[name] = Column(name, data_type, unique=_UNIQUE.search(options) is not None)
+    if _PRIMARY_KEY.search(options):
+        table.primary_key = table.primary_key + (name,)
+    references = _REFERENCES.search(options)
+    if references:
+        table.foreign_keys.append(ForeignKey((name,), _ident(references.group(1)), _names(references.group(2))))
+
+
+def parse_oracle_ddl(lines, report=None):
+    """Lê um script DDL Oracle (CREATE TABLE, ALTER TABLE ... ADD, CREATE SEQUENCE).
+
+    `lines` pode ser um arquivo aberto: o script é processado comando a
+    comando, sem carregar tudo na memória. Outros comandos são ignorados.
+    """
+    report = report if report is not None else ImportReport()
+    schema = Schema()
+    for statement in iter_statements(_counted(lines, report)):
+        report.statements += 1
+        match = _CREATE_TABLE.match(statement)
+        if match:
+            table = Table(_ident(match.group(1)))
+            for item in _split_top_level(_parenthesized(statement, match.end() - 1)):
+                _parse_table_item(table, item)
+            schema.tables[table.name] = table
+            continue
+        match = _ALTER_ADD.match(statement)
+        if match and _ident(match.group(1)) in schema.tables:
+            table = schema.tables[_ident(match.group(1))]
+            body = statement[match.end():].strip()
+            items = _split_top_level(_parenthesized(body, 0)) if body.startswith("(") else [body]
+            for item in items:
+                _parse_table_item(table, item)
+            continue
+        match = _CREATE_SEQUENCE.match(statement)
+        if match:
+            schema.sequences[_ident(match.group(1))] = statement + ";"
+            continue
+        report.skipped += 1
+    return schema
+
+
+# Nomes aceitos para cada campo do catálogo (ALL_TAB_COLUMNS, information_schema ou planilhas próprias)
+_CATALOG_FIELDS = {
+    "table": ("table_name", "table", "tabela"),
+    "column": ("column_name", "column", "coluna", "name"),
+    "type": ("data_type", "type", "tipo"),
+    "length": ("data_length", "char_length", "character_maximum_length", "tamanho"),
+    "precision": ("data_precision", "numeric_precision", "precisao"),
+    "scale": ("data_scale", "numeric_scale", "escala"),
+    "primary_key": ("is_primary_key", "primary_key", "pk", "column_key", "constraint_type"),
+    "unique": ("is_unique", "unique"),
+    "ref_table": ("references_table", "referenced_table_name", "r_table_name", "ref_table", "references"),
+    "ref_column": ("references_column", "referenced_column_name", "r_column_name", "ref_column"),
+}
+_TRUE = {"y", "yes", "s", "sim", "true", "1", "p", "pri", "x"}
+_SIZED_TYPES = {"VARCHAR2", "NVARCHAR2", "VARCHAR", "CHAR", "NCHAR", "RAW"}
+
+
+def _catalog_value(row, field):
+    for key in _CATALOG_FIELDS[field]:
+        value = row.get(key)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+# Monta o tipo a partir do catálogo (ex.: VARCHAR2 + 100 -> VARCHAR2(100))
+def _catalog_type(row):
+    data_type = _catalog_value(row, "type")
+    if data_type is None or "(" in data_type:
+        return data_type
+    base = data_type.upper()
+    length = _catalog_value(row, "length")
+    precision = _catalog_value(row, "precision")
+    scale = _catalog_value(row, "scale")
+    if base in _SIZED_TYPES and length:
+        return f"{data_type}({length})"
+    if base == "NUMBER" and precision:
+        return f"{data_type}({precision},{scale})" if scale and scale != "0" else f"{data_type}({precision})"
+    return data_type
+
+
+def _schema_from_rows(rows, report):
+    schema = Schema()
+    for i, raw in enumerate(rows, start=1):
+        row = {str(key).strip().lower(): value for key, value in raw.items() if key is not None}
+        table_name = _catalog_value(row, "table")
+        column_name = _catalog_value(row, "column")
+        data_type = _catalog_type(row)
+        if not table_name or not column_name or not data_type:
+            raise SchemaImportError(f"Linha {i} do catálogo sem tabela, coluna ou tipo.")
+        table = schema.tables.get(table_name)
+        if table is None:
+            table = schema.tables[table_name] = Table(table_name)
+        unique = (_catalog_value(row, "unique") or "").lower() in _TRUE
+        table.columns[column_name] = Column(column_name, data_type, unique)
+        if (_catalog_value(row, "primary_key") or "").lower() in _TRUE:
+            table.primary_key = table.primary_key + (column_name,)
+        ref_table = _catalog_value(row, "ref_table")
+        if ref_table:
+            ref_column = _catalog_value(row, "ref_column") or column_name
+            table.foreign_keys.append(ForeignKey((column_name,), ref_table, (ref_column,)))
+        report.statements += 1
+    return schema
+
+
+def parse_catalog_csv(lines, report=None):
+    """Lê um catálogo de colunas em CSV (uma linha por coluna), linha a linha."""
+    report = report if report is not None else ImportReport()
+    counted = _counted(lines, report)
+    first = next(counted, "")
+    # Aceita separador "," ou ";" (padrão das planilhas em português)
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    return _schema_from_rows(csv.DictReader(_chain(first, counted), delimiter=delimiter), report)
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _iter_json_rows(fp, report, chunk_size=1 << 16):
+    # Lista JSON lida em blocos e decodificada objeto a objeto; sem "[" inicial, trata como JSON Lines
+    def read():
+        chunk = fp.read(chunk_size)
+        report.characters += len(chunk)
+        return chunk
+
+    buffer = read().lstrip()
+    if not buffer.startswith("["):
+        while True:
+            *complete, buffer = buffer.split("\n")
+            for line in complete:
+                report.lines += 1
+                if line.strip():
+                    yield json.loads(line)
+            more = read()
+            if not more:
+                break
+            buffer += more
+        if buffer.strip():
+            yield json.loads(buffer)
+        return
+
+    decoder = json.JSONDecoder()
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        try:
+            row, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # Objeto cortado no fim do bloco: ler mais e tentar de novo
+            more = read()
+            if not more:
+                raise SchemaImportError("Catálogo JSON incompleto ou inválido.")
+            buffer += more
+            continue
+        yield row
+        buffer = buffer[end:]
+
+
+def parse_catalog_json(fp, report=None):
+    """Lê um catálogo de colunas em JSON (lista de objetos ou JSON Lines), em blocos."""
+    report = report if report is not None else ImportReport()
+    try:
+        return _schema_from_rows(_iter_json_rows(fp, report), report)
+    except json.JSONDecodeError as e:
+        raise SchemaImportError(f"Catálogo JSON inválido: {e}") from e
+    except AttributeError as e:
+        raise SchemaImportError("Cada item do catálogo JSON deve ser um objeto com os campos da coluna.") from e
+
+
+# Tabela gerada para um atributo multivalorado: <entidade>_<atributo>(<entidade>_id, <atributo>)
+def _multivalued_owner(name, table, tables):
+    if len(table.columns) != 2 or len(table.foreign_keys) != 1 or table.primary_key:
+        return None
+    fk = table.foreign_keys[0]
+    owner = fk.ref_table
+    values = [column for column in table.columns.values() if column.name not in fk.columns]
+    if owner not in tables or len(values) != 1 or name.lower() != f"{owner}_{values[0].name}".lower():
+        return None
+    return owner, values[0]
+
+
+# Tabela associativa: só duas colunas, ambas na PK e cada uma FK para uma entidade diferente
+def _association_fks(table, tables):
+    fks = table.foreign_keys
+    if len(table.columns) != 2 or len(fks) != 2 or set(table.primary_key) != set(table.columns):
+        return None
+    if any(len(fk.columns) != 1 or fk.ref_table not in tables for fk in fks) or fks[0].ref_table == fks[1].ref_table:
+        return None
+    return fks
+
+
+def model_from_schema(schema):
+    """Reconstrói o modelo ER a partir do esquema físico (o inverso de generate_sql).
+
+    - tabelas <entidade>_<atributo> com FK para a entidade viram atributos multivalorados;
+    - tabelas só com as duas FKs na PK viram relacionamentos N:N;
+    - colunas <entidade>_id com FK (fora da PK) viram relacionamentos 1:N, ou 1:1 se UNIQUE;
+    - as demais FKs ficam como atributos de chave estrangeira.
+    """
+    tables = schema.tables
+    multivalued = {}
+    associations = {}
+    for name, table in tables.items():
+        owner = _multivalued_owner(name, table, tables)
+        if owner is not None:
+            multivalued[name] = owner
+            continue
+        fks = _association_fks(table, tables)
+        if fks is not None:
+            associations[name] = fks
+
+    model = ERModel()
+    entity_tables = [name for name in tables if name not in multivalued and name not in associations]
+    for name in entity_tables:
+        model.add_entity(name)
+    attributes = {name: [] for name in entity_tables}
+    relationships = []
+    for name in entity_tables:
+        table = tables[name]
+        fk_by_column = {fk.columns[0]: fk for fk in table.foreign_keys if len(fk.columns) == 1}
+        for column in table.columns.values():
+            fk = fk_by_column.get(column.name)
+            is_pk = column.name in table.primary_key
+            if (fk is not None and not is_pk and fk.ref_table in model.entities and fk.ref_table != name
+                    and column.name.lower() == f"{fk.ref_table}_id".lower()):
+                relationships.append(Relationship(fk.ref_table, name, fk.name or f"fk_{name}_{fk.ref_table}", "1:1" if column.unique else "1:N"))
+                continue
+            attributes[name].append(Attribute(
+                column.name,
+                column.data_type,
+                is_primary_key=is_pk,
+                is_foreign_key=fk is not None,
+                references=fk.ref_table if fk is not None else None,
+                referenced_attr=fk.ref_columns[0] if fk is not None else None,
+            ))
+    for owner, column in multivalued.values():
+        if owner in attributes:
+            attributes[owner].append(Attribute(column.name, column.data_type, is_multivalued=True))
+    for name, (fk1, fk2) in associations.items():
+        relationships.append(Relationship(fk1.ref_table, fk2.ref_table, name, "N:N"))
+
+    for name in entity_tables:
+        model.set_attributes(name, attributes[name])
+    for rel in relationships:
+        if not model.has_relationship(rel.entity1, rel.entity2, rel.relationship_name):
+            model.add_relationship(rel)
+    return model
+
+
+def format_for_filename(name):
+    lowered = name.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".json", ".jsonl")):
+        return "json"
+    return "sql"
+
+
+def import_stream(fp, kind="sql"):
+    """Importa um script DDL ou catálogo de um arquivo de texto aberto; devolve (modelo, relatório)."""
+    if kind not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {kind}")
+    report = ImportReport()
+    start = time.perf_counter()
+    if kind == "sql":
+        schema = parse_oracle_ddl(fp, report)
+    elif kind == "csv":
+        schema = parse_catalog_csv(fp, report)
+    else:
+        schema = parse_catalog_json(fp, report)
+    model = model_from_schema(schema)
+    report.seconds = time.perf_counter() - start
+    report.tables = len(schema.tables)
+    report.columns = sum(len(table.columns) for table in schema.tables.values())
+    report.entities = len(model.entities)
+    report.relationships = len(model.relationships)
+    return model, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa um esquema existente (DDL Oracle ou catálogo CSV/JSON) como modelo.")
+    parser.add_argument("source", help="script .sql ou catálogo .csv/.json/.jsonl")
+    parser.add_argument("-o", "--output", default="modelo.dfz", help="arquivo de modelo gerado")
+    parser.add_argument("--format", choices=FORMATS, help="formato da entrada (padrão: pela extensão)")
+    parser.add_argument("--encoding", default="utf-8", help="codificação da entrada")
+    args = parser.parse_args(argv)
+
+    kind = args.format or format_for_filename(args.source)
+    try:
+        with open(args.source, encoding=args.encoding, newline="" if kind == "csv" else None) as f:
+            model, report = import_stream(f, kind)
+    except SchemaImportError as e:
+        print(e, file=sys.stderr)
+        return 1
+    save_model(model, args.output, compress=not args.output.endswith(".json"))
+    print(report.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import functools
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """Coleta tempos de execução nomeados (geradores, renderização, seções da página).
+
+    Cada medição entra na lista do rerun atual, num histórico circular por
+    nome (para percentis) e é repassada como evento aos ganchos registrados
+    com `add_hook`, que podem gravá-la em log ou enviá-la ao monitoramento.
+    """
+
+    def __init__(self, history=200, context=None):
+        self.history = history
+        # Campos fixos incluídos em todo evento (ex.: id da sessão)
+        self.context = dict(context or {})
+        self.reruns = 0
+        self.current = []
+        self._rerun_start = None
+        self._history = {}
+        self._events = deque(maxlen=history * 10)
+        # Execuções concluídas (completas e só de fragmentos), da mais antiga para a mais recente
+        self._finished = deque(maxlen=history)
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    # Registra uma função chamada como hook(evento) a cada medição
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def record(self, name, seconds, **fields):
+        event = {"ts": time.time(), "name": name, "ms": round(seconds * 1000, 3), "rerun": self.reruns, **self.context, **fields}
+        with self._lock:
+            self.current.append((name, seconds))
+            values = self._history.get(name)
+            if values is None:
+                values = self._history[name] = deque(maxlen=self.history)
+            values.append(seconds)
+            self._events.append(event)
+        for hook in list(self._hooks):
+            hook(event)
+
+    @contextmanager
+    def timer(self, name, **fields):
+        """Mede o bloco; o dicionário devolvido aceita campos extras (ex.: tamanho do resultado).
+
+        Exceções são registradas no campo "error" e propagadas normalmente
+        (st.rerun e st.stop não são erros: derivam de BaseException).
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def timed(self, name=None):
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def start_rerun(self):
+        with self._lock:
+            self.reruns += 1
+            self.current = []
+        self._rerun_start = time.perf_counter()
+
+    # `name` separa no histórico os reruns completos dos reruns só de um fragmento
+    def finish_rerun(self, name="rerun", **fields):
+        if self._rerun_start is not None:
+            seconds = time.perf_counter() - self._rerun_start
+            self.record(name, seconds, **fields)
+            with self._lock:
+                self._finished.append((self.reruns, name, seconds, fields))
+            self._rerun_start = None
+
+    def recent_reruns(self, count=10):
+        with self._lock:
+            return list(self._finished)[-count:][::-1]
+
+    @property
+    def in_rerun(self):
+        return self._rerun_start is not None
+
+    def percentiles(self, name, quantiles=(50, 90, 99)):
+        with self._lock:
+            values = sorted(self._history.get(name, ()))
+        if not values:
+            return {}
+        # Percentil por posição (nearest-rank)
+        return {q: values[max(0, -(-q * len(values) // 100) - 1)] for q in quantiles}
+
+    def summary(self):
+        """Uma linha por medição: quantidade e percentis em milissegundos do histórico recente."""
+        with self._lock:
+            names = list(self._history)
+        rows = []
+        for name in names:
+            with self._lock:
+                count = len(self._history[name])
+            p = self.percentiles(name)
+            rows.append({
+                "medição": name,
+                "amostras": count,
+                "p50 (ms)": round(p[50] * 1000, 1),
+                "p90 (ms)": round(p[90] * 1000, 1),
+                "p99 (ms)": round(p[99] * 1000, 1),
+            })
+        return rows
+
+    # Eventos recentes como JSON Lines, prontos para ingestão pelo monitoramento
+    def export_jsonl(self):
+        with self._lock:
+            events = list(self._events)
+        return "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+
+
+def jsonl_file_hook(path):
+    """Gancho que acrescenta cada evento como uma linha JSON ao arquivo."""
+    lock = threading.Lock()
+
+    def hook(event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    return hook
+
+
+# Tamanho aproximado em bytes de um objeto e de tudo o que ele referencia
+def estimate_size(obj):
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, (type, type(sys), type(estimate_size))):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            pending.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                pending.append(vars(item))
+            for cls in type(item).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(item, slot):
+                        pending.append(getattr(item, slot))
+    return total
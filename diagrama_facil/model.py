@@ -0,0 +1,196 @@
+import itertools
+from dataclasses import dataclass, field
+
+_version_counter = itertools.count(1)
+
+
+# Versão única no processo: atribuída a cada entidade/relacionamento alterado
+def next_version():
+    return next(_version_counter)
+
+
+class ModelError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class Attribute:
+    name: str
+    data_type: str
+    is_primary_key: bool = False
+    is_foreign_key: bool = False
+    is_multivalued: bool = False
+    is_derived: bool = False
+    references: str | None = None
+    referenced_attr: str | None = None
+
+
+@dataclass(slots=True)
+class FunctionalDependency:
+    lhs: tuple
+    rhs: tuple
+
+
+@dataclass(slots=True)
+class Entity:
+    name: str
+    is_weak: bool = False
+    supertype: str | None = None
+    subtypes: list = field(default_factory=list)
+    attributes: list = field(default_factory=list)
+    primary_key: str | None = None
+    primary_key_type: str | None = None
+    # Índice dos atributos marcados como chave primária, na ordem de inclusão
+    pk_attributes: list = field(default_factory=list)
+    functional_dependencies: list = field(default_factory=list)
+    version: int = field(default_factory=next_version)
+
+
+@dataclass(slots=True)
+class Relationship:
+    entity1: str
+    entity2: str
+    relationship_name: str
+    relationship_type: str
+    participation: str = "Total"
+    participation2: str = "Total"
+    version: int = field(default_factory=next_version)
+
+    @property
+    def key(self):
+        return (self.entity1, self.entity2, self.relationship_name)
+
+
+class ERModel:
+    """Modelo ER da sessão, com índices para consultas em tempo constante.
+
+    Mantém índices de relacionamentos por identidade (entidade1, entidade2,
+    nome) e por entidade de origem/destino. As alterações devem passar pelos
+    métodos do modelo para que índices e versões fiquem consistentes; cada
+    alteração é também repassada aos ouvintes registrados com `subscribe`.
+    """
+
+    __slots__ = ('entities', 'relationships', 'revision', '_relationship_index', '_outgoing', '_incoming', '_listeners')
+
+    def __init__(self):
+        self.entities = {}
+        self.relationships = []
+        self._relationship_index = {}
+        self._outgoing = {}
+        self._incoming = {}
+        # Renovada a cada alteração; serve de impressão digital barata do modelo inteiro
+        self.revision = next_version()
+        self._listeners = []
+
+    # Registra uma função chamada como listener(operação, *argumentos) após cada alteração
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _changed(self, op, *args):
+        self.revision = next_version()
+        for listener in self._listeners:
+            listener(op, *args)
+
+    def add_entity(self, name, is_weak=False, supertype=None):
+        if name in self.entities:
+            raise ModelError(f"A entidade '{name}' já existe.")
+        if supertype is not None and supertype not in self.entities:
+            raise ModelError(f"A entidade '{supertype}' não existe.")
+        entity = Entity(name, is_weak=is_weak, supertype=supertype)
+        self.entities[name] = entity
+        self._outgoing[name] = []
+        self._incoming[name] = []
+        if supertype is not None:
+            parent = self.entities[supertype]
+            parent.subtypes.append(name)
+            parent.version = next_version()
+        self._changed('add_entity', name, is_weak, supertype)
+        return entity
+
+    # Adiciona o atributo; devolve False se ele é PK mas a entidade já tinha chave primária
+    def add_attribute(self, entity_name, attribute):
+        entity = self.entities[entity_name]
+        pk_accepted = True
+        if attribute.is_primary_key:
+            if entity.primary_key:
+                pk_accepted = False
+            else:
+                entity.primary_key = attribute.name
+                entity.primary_key_type = attribute.data_type
+            entity.pk_attributes.append(attribute)
+        entity.attributes.append(attribute)
+        entity.version = next_version()
+        self._changed('add_attribute', entity_name, attribute)
+        return pk_accepted
+
+    # Substitui todos os atributos da entidade (usado ao aplicar uma decomposição)
+    def set_attributes(self, entity_name, attributes, functional_dependencies=None, is_weak=None):
+        entity = self.entities[entity_name]
+        if is_weak is not None:
+            entity.is_weak = is_weak
+        entity.attributes = []
+        entity.pk_attributes = []
+        entity.primary_key = None
+        entity.primary_key_type = None
+        for attribute in attributes:
+            if attribute.is_primary_key:
+                if not entity.primary_key:
+                    entity.primary_key = attribute.name
+                    entity.primary_key_type = attribute.data_type
+                entity.pk_attributes.append(attribute)
+            entity.attributes.append(attribute)
+        if functional_dependencies is not None:
+            entity.functional_dependencies = list(functional_dependencies)
+        entity.version = next_version()
+        self._changed('set_attributes', entity_name, entity.attributes, entity.functional_dependencies, entity.is_weak)
+
+    def add_functional_dependency(self, entity_name, lhs, rhs):
+        entity = self.entities[entity_name]
+        names = {attr.name for attr in entity.attributes}
+        unknown = [name for name in (*lhs, *rhs) if name not in names]
+        if unknown:
+            raise ModelError(f"Atributos inexistentes em '{entity_name}': {', '.join(unknown)}.")
+        if not rhs:
+            raise ModelError("A dependência funcional precisa de ao menos um atributo determinado.")
+        fd = FunctionalDependency(tuple(lhs), tuple(rhs))
+        if fd in entity.functional_dependencies:
+            raise ModelError("Esta dependência funcional já foi adicionada.")
+        entity.functional_dependencies.append(fd)
+        entity.version = next_version()
+        self._changed('add_functional_dependency', entity_name, fd.lhs, fd.rhs)
+        return fd
+
+    def pk_attributes(self, entity_name):
+        return self.entities[entity_name].pk_attributes
+
+    def has_relationship(self, entity1, entity2, relationship_name):
+        return (entity1, entity2, relationship_name) in self._relationship_index
+
+    def get_relationship(self, entity1, entity2, relationship_name):
+        return self._relationship_index.get((entity1, entity2, relationship_name))
+
+    def add_relationship(self, relationship):
+        if relationship.entity1 == relationship.entity2:
+            raise ModelError("Não é permitido relacionar uma entidade consigo mesma.")
+        for name in (relationship.entity1, relationship.entity2):
+            if name not in self.entities:
+                raise ModelError(f"A entidade '{name}' não existe.")
+        if relationship.key in self._relationship_index:
+            raise ModelError("Este relacionamento já foi adicionado.")
+        self.relationships.append(relationship)
+        self._relationship_index[relationship.key] = relationship
+        self._outgoing[relationship.entity1].append(relationship)
+        self._incoming[relationship.entity2].append(relationship)
+        self._changed('add_relationship', relationship)
+        return relationship
+
+    # Relacionamentos em que a entidade aparece como "Entidade 1"
+    def outgoing(self, entity_name):
+        return self._outgoing.get(entity_name, [])
+
+    # Relacionamentos em que a entidade aparece como "Entidade 2"
+    def incoming(self, entity_name):
+        return self._incoming.get(entity_name, [])
@@ -0,0 +1,334 @@
+import dataclasses
+
+from diagrama_facil.model import FunctionalDependency
+
+
+# Itera sobre os índices dos bits ligados de um conjunto de atributos
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FDSet:
+    """Conjunto de dependências funcionais sobre atributos representados como bitsets.
+
+    Cada atributo ocupa um bit; conjuntos de atributos são inteiros. O fecho
+    é calculado pelo algoritmo linear de Beeri-Bernstein (um contador por
+    dependência com os atributos do lado esquerdo ainda não alcançados).
+    """
+
+    def __init__(self, attributes, fds=()):
+        self.attributes = list(attributes)
+        self.index = {name: i for i, name in enumerate(self.attributes)}
+        self.all = (1 << len(self.attributes)) - 1
+        self.fds = []
+        for lhs, rhs in fds:
+            self.add(self.mask(lhs) if not isinstance(lhs, int) else lhs,
+                     self.mask(rhs) if not isinstance(rhs, int) else rhs)
+
+    def add(self, lhs, rhs):
+        self.fds.append((lhs, rhs))
+
+    def mask(self, names):
+        mask = 0
+        for name in names:
+            mask |= 1 << self.index[name]
+        return mask
+
+    def names(self, mask):
+        return tuple(self.attributes[i] for i in iter_bits(mask))
+
+    # Fecho de um conjunto de atributos; `skip` ignora uma dependência (usado na cobertura mínima)
+    def closure(self, mask, skip=None):
+        uses = [[] for _ in self.attributes]
+        missing = []
+        result = mask
+        pending = []
+        for i, (lhs, rhs) in enumerate(self.fds):
+            if i == skip:
+                missing.append(-1)
+                continue
+            count = 0
+            for a in iter_bits(lhs):
+                uses[a].append(i)
+                count += 1
+            missing.append(count)
+            if count == 0:
+                pending.append(i)
+        queue = list(iter_bits(mask))
+        for a in queue:
+            for i in uses[a]:
+                missing[i] -= 1
+                if missing[i] == 0:
+                    pending.append(i)
+        while pending:
+            new = self.fds[pending.pop()][1] & ~result
+            result |= new
+            for a in iter_bits(new):
+                for i in uses[a]:
+                    missing[i] -= 1
+                    if missing[i] == 0:
+                        pending.append(i)
+        return result
+
+    def is_superkey(self, mask, within=None):
+        within = self.all if within is None else within
+        return self.closure(mask) & within == within
+
+    # Remove atributos até restar uma chave mínima contida em `mask`
+    def minimize_key(self, mask, within=None):
+        within = self.all if within is None else within
+        for a in iter_bits(mask):
+            candidate = mask & ~(1 << a)
+            if self.is_superkey(candidate, within):
+                mask = candidate
+        return mask
+
+    def candidate_keys(self):
+        """Todas as chaves candidatas (algoritmo de Lucchesi-Osborn).
+
+        O custo é polinomial no número de dependências e de chaves encontradas,
+        em vez de exponencial no número de atributos. Atributos que nunca são
+        determinados entram em toda chave; os que só aparecem à direita não
+        entram em nenhuma, o que reduz o trabalho de minimização. Vale para a
+        relação inteira: numa projeção as dependências declaradas não bastam
+        (para a chave de uma relação da decomposição, use `minimize_key`).
+        """
+        determined = 0
+        for lhs, rhs in self.fds:
+            determined |= rhs & ~lhs
+        core = self.all & ~determined
+        first = self.minimize_key(self.all)
+        keys = [first]
+        seen = {first}
+        for key in keys:
+            for lhs, rhs in self.fds:
+                candidate = lhs | (key & ~rhs) | core
+                if any(k & ~candidate == 0 for k in keys):
+                    continue
+                new_key = self.minimize_key(candidate)
+                if new_key not in seen:
+                    seen.add(new_key)
+                    keys.append(new_key)
+        return keys
+
+    def minimal_cover(self):
+        """Cobertura mínima: lado direito unitário, sem atributos estranhos e sem redundâncias."""
+        cover = FDSet(self.attributes)
+        for lhs, rhs in self.fds:
+            for a in iter_bits(rhs & ~lhs):
+                cover.add(lhs, 1 << a)
+        # Atributos estranhos do lado esquerdo
+        for i, (lhs, rhs) in enumerate(cover.fds):
+            for a in iter_bits(lhs):
+                reduced = lhs & ~(1 << a)
+                if cover.closure(reduced) & rhs:
+                    lhs = reduced
+            cover.fds[i] = (lhs, rhs)
+        cover.fds = list(dict.fromkeys(cover.fds))
+        # Dependências redundantes
+        i = 0
+        while i < len(cover.fds):
+            lhs, rhs = cover.fds[i]
+            if cover.closure(lhs, skip=i) & rhs:
+                del cover.fds[i]
+            else:
+                i += 1
+        return cover
+
+
+@dataclasses.dataclass(slots=True)
+class Violation:
+    normal_form: str
+    lhs: tuple
+    rhs: tuple
+    reason: str
+
+
+@dataclasses.dataclass(slots=True)
+class Relation:
+    attributes: tuple
+    key: tuple
+
+
+@dataclasses.dataclass(slots=True)
+class NormalizationReport:
+    entity: str
+    candidate_keys: list
+    minimal_cover: list
+    violations: list
+    normal_form: str
+    decomposition_3nf: list
+    decomposition_bcnf: list
+
+
+# Colunas da tabela principal: multivalorados e derivados não participam das dependências
+def entity_columns(entity):
+    return [attr.name for attr in entity.attributes if not attr.is_multivalued and not attr.is_derived]
+
+
+def fdset_for_entity(entity):
+    columns = entity_columns(entity)
+    present = set(columns)
+    fds = [
+        (fd.lhs, [name for name in fd.rhs if name in present])
+        for fd in entity.functional_dependencies
+        if all(name in present for name in fd.lhs)
+    ]
+    # A chave primária declarada determina todas as colunas, mesmo sem dependência explícita
+    pk = [attr.name for attr in entity.pk_attributes if attr.name in present]
+    if pk:
+        fds.append((pk, columns))
+    return FDSet(columns, fds)
+
+
+def find_violations(fdset, keys, cover=None):
+    cover = cover or fdset.minimal_cover()
+    prime = 0
+    for key in keys:
+        prime |= key
+    violations = []
+    for lhs, rhs in cover.fds:
+        if fdset.is_superkey(lhs):
+            continue
+        lhs_names, rhs_names = fdset.names(lhs), fdset.names(rhs)
+        if rhs & prime:
+            violations.append(Violation("BCNF", lhs_names, rhs_names, "o determinante não é superchave"))
+        elif any(lhs & ~key == 0 and lhs != key for key in keys):
+            violations.append(Violation("2FN", lhs_names, rhs_names, "dependência parcial de uma chave candidata"))
+        else:
+            violations.append(Violation("3FN", lhs_names, rhs_names, "dependência transitiva de atributo não-chave"))
+    return violations
+
+
+def highest_normal_form(violations):
+    forms = {v.normal_form for v in violations}
+    if "2FN" in forms:
+        return "1FN"
+    if "3FN" in forms:
+        return "2FN"
+    if "BCNF" in forms:
+        return "3FN"
+    return "BCNF"
+
+
+def synthesize_3nf(fdset, keys, cover=None):
+    """Síntese de Bernstein: decomposição em 3FN sem perdas e que preserva dependências."""
+    cover = cover or fdset.minimal_cover()
+    groups = {}
+    for lhs, rhs in cover.fds:
+        groups[lhs] = groups.get(lhs, 0) | rhs
+    relations = [(lhs | rhs, lhs) for lhs, rhs in groups.items()]
+    if not any(key & ~attrs == 0 for key in keys for attrs, _ in relations):
+        relations.append((keys[0], keys[0]))
+    # Descarta relações contidas em outras
+    kept = []
+    for i, (attrs, key) in enumerate(relations):
+        if any(j != i and attrs & ~other == 0 and (attrs != other or j < i) for j, (other, _) in enumerate(relations)):
+            continue
+        kept.append((attrs, key))
+    return [_relation(fdset, attrs) for attrs, _ in kept]
+
+
+def decompose_bcnf(fdset):
+    """Decomposição em BCNF sem perdas, separando pelo fecho de cada determinante violador.
+
+    Verifica apenas determinantes das dependências declaradas, o que mantém o
+    custo polinomial; a decomposição é sempre sem perdas, mas pode não
+    preservar todas as dependências.
+    """
+    pending = [fdset.all]
+    done = []
+    while pending:
+        attrs = pending.pop()
+        for lhs, _ in fdset.fds:
+            if lhs & ~attrs:
+                continue
+            closure = fdset.closure(lhs) & attrs
+            if closure != attrs and closure != lhs:
+                pending.append(closure)
+                pending.append(attrs & ~(closure & ~lhs))
+                break
+        else:
+            done.append(attrs)
+    done.reverse()
+    return [_relation(fdset, attrs) for attrs in done]
+
+
+def _relation(fdset, attrs):
+    # Basta uma chave da relação: reduzir o conjunto inteiro é linear, enumerar todas as chaves não
+    return Relation(fdset.names(attrs), fdset.names(fdset.minimize_key(attrs, attrs)))
+
+
+def normalize_entity(entity):
+    fdset = fdset_for_entity(entity)
+    keys = fdset.candidate_keys()
+    cover = fdset.minimal_cover()
+    violations = find_violations(fdset, keys, cover)
+    return NormalizationReport(
+        entity=entity.name,
+        candidate_keys=[fdset.names(key) for key in keys],
+        minimal_cover=[FunctionalDependency(fdset.names(lhs), fdset.names(rhs)) for lhs, rhs in cover.fds],
+        violations=violations,
+        normal_form=highest_normal_form(violations),
+        decomposition_3nf=synthesize_3nf(fdset, keys, cover) if violations else [],
+        decomposition_bcnf=decompose_bcnf(fdset) if violations else [],
+    )
+
+
+def apply_decomposition(model, entity_name, relations):
+    """Substitui a entidade pelas relações da decomposição.
+
+    A relação que contém uma chave da entidade original mantém o nome dela,
+    preservando os relacionamentos já definidos; as demais viram novas
+    entidades, referenciadas por chave estrangeira quando a chave é simples.
+    Devolve os nomes das entidades resultantes.
+    """
+    entity = model.entities[entity_name]
+    fdset = fdset_for_entity(entity)
+    by_name = {attr.name: attr for attr in entity.attributes}
+    # Multivalorados e derivados não entram na decomposição e ficam na entidade original
+    extras = [attr for attr in entity.attributes if attr.name not in fdset.index]
+    main = next(i for i, rel in enumerate(relations) if fdset.is_superkey(fdset.mask(rel.attributes)))
+
+    names = []
+    for i, rel in enumerate(relations):
+        if i == main:
+            names.append(entity_name)
+            continue
+        name = f"{entity_name}_{'_'.join(rel.key)}"
+        suffix = 2
+        while name in model.entities or name in names:
+            name = f"{entity_name}_{'_'.join(rel.key)}_{suffix}"
+            suffix += 1
+        names.append(name)
+
+    cover = fdset.minimal_cover()
+    for i, rel in enumerate(relations):
+        attrs = []
+        for attr_name in rel.attributes:
+            attr = dataclasses.replace(by_name[attr_name], is_primary_key=attr_name in rel.key)
+            for j, other in enumerate(relations):
+                # Chave simples de outra relação presente aqui vira chave estrangeira
+                if j != i and other.key == (attr_name,) and attr_name not in rel.key:
+                    attr.is_foreign_key = True
+                    attr.references = names[j]
+                    attr.referenced_attr = attr_name
+            attrs.append(attr)
+        # Dependências projetadas na relação (as que cabem inteiras nela); as da própria PK ficam implícitas
+        rel_mask = fdset.mask(rel.attributes)
+        key_mask = fdset.mask(rel.key)
+        fds = [
+            FunctionalDependency(fdset.names(lhs), fdset.names(rhs))
+            for lhs, rhs in cover.fds
+            if (lhs | rhs) & ~rel_mask == 0 and lhs != key_mask
+        ]
+        if i != main:
+            model.add_entity(names[i])
+        model.set_attributes(names[i], attrs, fds)
+
+    if extras:
+        model.set_attributes(entity_name, model.entities[entity_name].attributes + extras)
+    return names
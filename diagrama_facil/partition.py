@@ -0,0 +1,245 @@
+import heapq
+from dataclasses import dataclass, field
+
+from diagrama_facil.generators import PLANTUML_HEADER, _memoized, entity_plantuml, relationship_plantuml
+
+# Acima deste número de entidades o diagrama único fica lento de renderizar e ilegível
+DEFAULT_AREA_SIZE = 40
+
+
+@dataclass(slots=True)
+class SubjectArea:
+    index: int
+    entities: list = field(default_factory=list)
+    # Entidade com mais relacionamentos da área, usada no título
+    hub: str | None = None
+
+    @property
+    def title(self):
+        return f"Área {self.index}: {self.hub}"
+
+    @property
+    def alias(self):
+        return f"area_{self.index}"
+
+
+def _find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+# Agrupa as unidades de um componente grande em clusters de no máximo `max_size` entidades.
+# Junta primeiro os pares mais ligados em relação ao tamanho (peso / (tamanho_a * tamanho_b)).
+def _cluster(units, sizes, edges, max_size):
+    members = {u: [u] for u in units}
+    size = {u: sizes[u] for u in units}
+    adjacency = {u: {} for u in units}
+    for (a, b), weight in edges.items():
+        adjacency[a][b] = weight
+        adjacency[b][a] = weight
+    order = {u: i for i, u in enumerate(units)}
+    heap = []
+
+    def push(a, b):
+        if size[a] + size[b] <= max_size:
+            score = adjacency[a][b] / (size[a] * size[b])
+            heapq.heappush(heap, (-score, order[a], order[b], a, b, size[a], size[b]))
+
+    for (a, b) in edges:
+        push(a, b)
+    while heap:
+        _, _, _, a, b, size_a, size_b = heapq.heappop(heap)
+        # Entradas desatualizadas: algum dos clusters já foi fundido ou cresceu
+        if a not in members or b not in members or size[a] != size_a or size[b] != size_b:
+            continue
+        if size[a] < size[b]:
+            a, b = b, a
+        members[a].extend(members.pop(b))
+        size[a] += size.pop(b)
+        for neighbor, weight in adjacency.pop(b).items():
+            del adjacency[neighbor][b]
+            if neighbor != a:
+                adjacency[a][neighbor] = adjacency[a].get(neighbor, 0) + weight
+                adjacency[neighbor][a] = adjacency[a][neighbor]
+        for neighbor in adjacency[a]:
+            push(a, neighbor)
+
+    # Sobram clusters pequenos que não podem mais crescer (ex.: folhas de uma entidade central já cheia).
+    # São empacotados como os componentes pequenos, preferindo a área à qual estão mais ligados.
+    bins = []
+    bin_of = {}
+    for cluster in sorted(members, key=lambda u: (-size[u], order[u])):
+        links = {}
+        for neighbor, weight in adjacency[cluster].items():
+            if neighbor in bin_of:
+                links[bin_of[neighbor]] = links.get(bin_of[neighbor], 0) + weight
+        fits = [i for i, packed in enumerate(bins) if packed[0] + size[cluster] <= max_size]
+        linked = [i for i in fits if i in links]
+        if linked:
+            target = max(linked, key=lambda i: links[i])
+        elif fits:
+            target = fits[0]
+        else:
+            target = len(bins)
+            bins.append([0, []])
+        bins[target][0] += size[cluster]
+        bins[target][1].extend(members[cluster])
+        bin_of[cluster] = target
+    return [packed for _, packed in bins]
+
+
+def partition_model(model, max_size=DEFAULT_AREA_SIZE):
+    """Divide o modelo em áreas de assunto com até `max_size` entidades.
+
+    Árvores de generalização nunca são separadas. Componentes conexos que
+    cabem numa área são mantidos inteiros (e os pequenos são agrupados);
+    os maiores são divididos pelo agrupamento guloso de `_cluster`.
+    """
+    entities = model.entities
+    parent = {name: name for name in entities}
+    for name, entity in entities.items():
+        if entity.supertype in parent:
+            parent[_find(parent, name)] = _find(parent, entity.supertype)
+    unit_of = {name: _find(parent, name) for name in entities}
+    units = list(dict.fromkeys(unit_of.values()))
+    sizes = dict.fromkeys(units, 0)
+    for unit in unit_of.values():
+        sizes[unit] += 1
+
+    # Arestas entre unidades: relacionamentos e atributos de chave estrangeira
+    edges = {}
+    degree = dict.fromkeys(entities, 0)
+
+    def link(e1, e2):
+        if e1 not in entities or e2 not in entities:
+            return
+        degree[e1] += 1
+        degree[e2] += 1
+        a, b = unit_of[e1], unit_of[e2]
+        if a != b:
+            key = (a, b) if a < b else (b, a)
+            edges[key] = edges.get(key, 0) + 1
+
+    for rel in model.relationships:
+        link(rel.entity1, rel.entity2)
+    for name, entity in entities.items():
+        for attr in entity.attributes:
+            if attr.is_foreign_key and attr.references:
+                link(name, attr.references)
+
+    # Componentes conexos sobre as unidades
+    neighbors = {u: [] for u in units}
+    for a, b in edges:
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+    component_of = {}
+    components = []
+    for root in units:
+        if root in component_of:
+            continue
+        component = [root]
+        component_of[root] = len(components)
+        for unit in component:
+            for neighbor in neighbors[unit]:
+                if neighbor not in component_of:
+                    component_of[neighbor] = len(components)
+                    component.append(neighbor)
+        components.append(component)
+
+    component_edges = [{} for _ in components]
+    for key, weight in edges.items():
+        component_edges[component_of[key[0]]][key] = weight
+
+    groups = []
+    small = []
+    for i, component in enumerate(components):
+        total = sum(sizes[u] for u in component)
+        if total > max_size:
+            groups.extend(_cluster(component, sizes, component_edges[i], max_size))
+        else:
+            small.append((total, component))
+    # Componentes pequenos são empacotados juntos (first-fit decrescente) para não gerar áreas minúsculas
+    bins = []
+    for total, component in sorted(small, key=lambda item: -item[0]):
+        for packed in bins:
+            if packed[0] + total <= max_size:
+                packed[0] += total
+                packed[1].extend(component)
+                break
+        else:
+            bins.append([total, list(component)])
+    groups.extend(packed for _, packed in bins)
+
+    # Entidades de cada área na ordem original do modelo
+    group_of = {}
+    for i, group in enumerate(groups):
+        for unit in group:
+            group_of[unit] = i
+    grouped = [[] for _ in groups]
+    for name in entities:
+        grouped[group_of[unit_of[name]]].append(name)
+    position = {name: i for i, name in enumerate(entities)}
+    grouped.sort(key=lambda names: position[names[0]])
+    areas = []
+    for i, names in enumerate(grouped, start=1):
+        hub = max(names, key=lambda name: degree[name])
+        areas.append(SubjectArea(i, names, hub))
+    return areas
+
+
+def area_plantuml(model, area, area_of, relationships, memo=None):
+    """Diagrama de uma área; entidades de outras áreas aparecem só pelo nome, com a área indicada."""
+    entities = model.entities
+    parts = [PLANTUML_HEADER]
+    for name in area.entities:
+        entity = entities[name]
+        parts.append(_memoized(memo, ('uml', name), entity.version, lambda: entity_plantuml(name, entity)))
+    stubs = dict.fromkeys(
+        name for rel in relationships for name in (rel.entity1, rel.entity2) if area_of[name] is not area
+    )
+    # Só o número da área no estereótipo, para que mudanças em outras áreas não alterem este diagrama
+    for name in stubs:
+        parts.append(f"entity \"{name}\" as {name} <<Área {area_of[name].index}>> {{\n}}\n")
+    for rel in relationships:
+        parts.append(_memoized(memo, ('uml',) + rel.key, rel.version, lambda: relationship_plantuml(rel)))
+    parts.append("@enduml")
+    return "".join(parts)
+
+
+def overview_plantuml(areas, links):
+    """Visão geral: uma caixa por área e uma ligação com o número de relacionamentos entre elas."""
+    parts = ["@startuml\nskinparam linetype ortho\n"]
+    for area in areas:
+        parts.append(f"rectangle \"{area.title}\\n{len(area.entities)} entidades\" as {area.alias}\n")
+    for (a, b), count in links.items():
+        parts.append(f"area_{a} -- area_{b} : \"{count} relacionamento(s)\"\n")
+    parts.append("@enduml")
+    return "".join(parts)
+
+
+def area_diagrams(model, max_size=DEFAULT_AREA_SIZE, memo=None):
+    """Visão geral seguida de um diagrama por área, como pares (título, código PlantUML).
+
+    Cada área é um documento independente: uma alteração só muda o código
+    (e portanto a chave no cache de imagens) das áreas afetadas.
+    """
+    areas = partition_model(model, max_size)
+    area_of = {}
+    for area in areas:
+        for name in area.entities:
+            area_of[name] = area
+    by_area = {area.index: [] for area in areas}
+    links = {}
+    for rel in model.relationships:
+        a, b = area_of[rel.entity1], area_of[rel.entity2]
+        by_area[a.index].append(rel)
+        if a is not b:
+            by_area[b.index].append(rel)
+            key = (min(a.index, b.index), max(a.index, b.index))
+            links[key] = links.get(key, 0) + 1
+    diagrams = [("Visão geral", overview_plantuml(areas, links))]
+    for area in areas:
+        diagrams.append((area.title, area_plantuml(model, area, area_of, by_area[area.index], memo)))
+    return diagrams
@@ -0,0 +1,322 @@
+import gzip
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from diagrama_facil.model import Attribute, ERModel, FunctionalDependency, Relationship
+
+FORMAT_NAME = "diagrama-facil"
+FORMAT_VERSION = 1
+
+# Flags dos atributos, gravadas como um único inteiro
+_PRIMARY_KEY = 1
+_FOREIGN_KEY = 2
+_MULTIVALUED = 4
+_DERIVED = 8
+
+
+class PersistenceError(ValueError):
+    pass
+
+
+def _encode_attribute(attr):
+    flags = (
+        (_PRIMARY_KEY if attr.is_primary_key else 0)
+        | (_FOREIGN_KEY if attr.is_foreign_key else 0)
+        | (_MULTIVALUED if attr.is_multivalued else 0)
+        | (_DERIVED if attr.is_derived else 0)
+    )
+    if attr.references is None and attr.referenced_attr is None:
+        return [attr.name, attr.data_type, flags]
+    return [attr.name, attr.data_type, flags, attr.references, attr.referenced_attr]
+
+
+def _decode_attribute(row):
+    flags = row[2]
+    return Attribute(
+        row[0],
+        row[1],
+        is_primary_key=bool(flags & _PRIMARY_KEY),
+        is_foreign_key=bool(flags & _FOREIGN_KEY),
+        is_multivalued=bool(flags & _MULTIVALUED),
+        is_derived=bool(flags & _DERIVED),
+        references=row[3] if len(row) > 3 else None,
+        referenced_attr=row[4] if len(row) > 4 else None,
+    )
+
+
+def _encode_relationship(rel):
+    return [rel.entity1, rel.entity2, rel.relationship_name, rel.relationship_type, rel.participation, rel.participation2]
+
+
+def _decode_relationship(row):
+    return Relationship(*row)
+
+
+def _encode_fds(fds):
+    return [[list(fd.lhs), list(fd.rhs)] for fd in fds]
+
+
+def _decode_fds(rows):
+    return [FunctionalDependency(tuple(lhs), tuple(rhs)) for lhs, rhs in rows]
+
+
+# Representação compacta do modelo: listas posicionais em vez de dicionários
+def dump_model(model):
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "entities": [
+            [
+                entity.name,
+                entity.is_weak,
+                entity.supertype,
+                entity.subtypes,
+                [_encode_attribute(attr) for attr in entity.attributes],
+                _encode_fds(entity.functional_dependencies),
+            ]
+            for entity in model.entities.values()
+        ],
+        "relationships": [_encode_relationship(rel) for rel in model.relationships],
+    }
+
+
+def load_model(data):
+    if not isinstance(data, dict) or data.get("format") != FORMAT_NAME:
+        raise PersistenceError("O arquivo não contém um modelo do Diagrama Fácil.")
+    if data.get("version", 0) > FORMAT_VERSION:
+        raise PersistenceError(f"Versão de formato não suportada: {data.get('version')}.")
+    model = ERModel()
+    rows = data["entities"]
+    # Primeiro cria todas as entidades; supertipos/subtipos são ligados depois,
+    # preservando a ordem original das listas de subtipos
+    for name, is_weak, _, _, _, _ in rows:
+        model.add_entity(name, is_weak=is_weak)
+    for name, _, supertype, subtypes, attributes, fds in rows:
+        entity = model.entities[name]
+        missing = [other for other in ([supertype] if supertype is not None else []) + list(subtypes) if other not in model.entities]
+        if missing:
+            raise PersistenceError(f"A entidade '{name}' referencia entidades inexistentes: {', '.join(map(str, missing))}.")
+        entity.supertype = supertype
+        entity.subtypes = list(subtypes)
+        model.set_attributes(name, [_decode_attribute(row) for row in attributes], _decode_fds(fds))
+    for row in data["relationships"]:
+        model.add_relationship(_decode_relationship(row))
+    return model
+
+
+def model_to_bytes(model, compress=True):
+    raw = json.dumps(dump_model(model), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(raw, compresslevel=6, mtime=0) if compress else raw
+
+
+def model_from_bytes(data):
+    try:
+        # Arquivos comprimidos são reconhecidos pelo cabeçalho do gzip
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        return load_model(json.loads(data))
+    except PersistenceError:
+        raise
+    except (OSError, EOFError, AttributeError, LookupError, TypeError, ValueError) as e:
+        raise PersistenceError(f"Arquivo de modelo inválido: {e}") from e
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_model(model, path, compress=None):
+    if compress is None:
+        compress = path.endswith(".gz")
+    _atomic_write(path, model_to_bytes(model, compress))
+
+
+def read_model(path):
+    with open(path, "rb") as f:
+        return model_from_bytes(f.read())
+
+
+class EditLog:
+    """Registro de alterações somente-acréscimo, usado para desfazer e para recuperação.
+
+    Cada linha é um registro JSON: uma operação do modelo, um "undo" ou um
+    "snapshot" com o modelo inteiro (base após importação ou compactação).
+    As operações de uma mesma ação do usuário ficam entre "begin" e "commit"
+    e são desfeitas juntas; um grupo sem "commit" (queda no meio da ação) é
+    descartado. Uma linha final incompleta, deixada por uma queda no meio da
+    escrita, é ignorada na reconstrução.
+
+    Quando o arquivo passa de `compact_after` registros, replay() o reescreve
+    como uma base com o modelo e as últimas `keep_actions` ações; as ações
+    mais antigas deixam de poder ser desfeitas.
+    """
+
+    def __init__(self, path, compact_after=2000, keep_actions=100):
+        self.path = path
+        self.compact_after = compact_after
+        self.keep_actions = keep_actions
+        # Ações após a última base que ainda podem ser desfeitas
+        self.undoable = 0
+        self._depth = 0
+        self._group_open = False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._repair()
+
+    # Remove uma linha final incompleta para que novos registros não se misturem a ela
+    def _repair(self):
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def action(self):
+        """Agrupa as alterações feitas no bloco numa única ação para desfazer."""
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._group_open:
+                self._group_open = False
+                self._append(["commit"])
+                self.undoable += 1
+
+    # Ouvinte para ERModel.subscribe: grava cada alteração assim que ela acontece
+    def record(self, op, *args):
+        if self._depth and not self._group_open:
+            # O "begin" só é gravado na primeira alteração, para não criar ações vazias
+            self._append(["begin"])
+            self._group_open = True
+        if op == 'add_entity':
+            name, is_weak, supertype = args
+            self._append([op, name, is_weak, supertype])
+        elif op == 'add_attribute':
+            entity_name, attribute = args
+            self._append([op, entity_name, _encode_attribute(attribute)])
+        elif op == 'set_attributes':
+            entity_name, attributes, fds, is_weak = args
+            self._append([op, entity_name, [_encode_attribute(a) for a in attributes], _encode_fds(fds), is_weak])
+        elif op == 'add_functional_dependency':
+            entity_name, lhs, rhs = args
+            self._append([op, entity_name, list(lhs), list(rhs)])
+        elif op == 'add_relationship':
+            self._append([op, _encode_relationship(args[0])])
+        else:
+            raise PersistenceError(f"Operação desconhecida: {op}")
+        if not self._depth:
+            self.undoable += 1
+
+    def undo(self):
+        if self.undoable:
+            self._append(["undo"])
+            self.undoable -= 1
+
+    # Reinicia o registro a partir de um modelo completo (importação de arquivo)
+    def checkpoint(self, model):
+        line = json.dumps(["snapshot", dump_model(model)], ensure_ascii=False, separators=(",", ":")) + "\n"
+        _atomic_write(self.path, line.encode("utf-8"))
+        self.undoable = 0
+
+    # Reescreve o registro como base + ações recentes, cada uma no seu grupo
+    def _compact(self, base_model, actions):
+        records = [["snapshot", dump_model(base_model)]]
+        for action in actions:
+            records += [["begin"], *action, ["commit"]]
+        data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        _atomic_write(self.path, data.encode("utf-8"))
+
+    def _records(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for i, line in enumerate(lines):
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                if i == len(lines) - 1:
+                    break  # escrita interrompida
+                raise PersistenceError(f"Registro corrompido na linha {i + 1} de {self.path}.")
+        return records
+
+    @staticmethod
+    def _apply(model, action):
+        for record in action:
+            op = record[0]
+            if op == 'add_entity':
+                model.add_entity(record[1], is_weak=record[2], supertype=record[3])
+            elif op == 'add_attribute':
+                model.add_attribute(record[1], _decode_attribute(record[2]))
+            elif op == 'set_attributes':
+                model.set_attributes(record[1], [_decode_attribute(r) for r in record[2]], _decode_fds(record[3]), is_weak=record[4])
+            elif op == 'add_functional_dependency':
+                model.add_functional_dependency(record[1], record[2], record[3])
+            elif op == 'add_relationship':
+                model.add_relationship(_decode_relationship(record[1]))
+
+    def replay(self):
+        """Reconstrói o modelo a partir da última base e das ações não desfeitas."""
+        base = None
+        actions = []
+        group = None
+        records = self._records()
+        for record in records:
+            if record[0] == "snapshot":
+                base, actions, group = record[1], [], None
+            elif record[0] == "begin":
+                group = []  # um grupo anterior sem "commit" é descartado
+            elif record[0] == "commit":
+                if group is not None:
+                    actions.append(group)
+                group = None
+            elif record[0] == "rollback":
+                group = None
+            elif record[0] == "undo":
+                if actions:
+                    actions.pop()
+            elif group is not None:
+                group.append(record)
+            else:
+                actions.append([record])
+        model = load_model(base) if base is not None else ERModel()
+        compact = len(records) > self.compact_after
+        if compact:
+            # As ações antigas entram na nova base; só as recentes continuam desfazíveis
+            split = max(0, len(actions) - self.keep_actions)
+            for action in actions[:split]:
+                self._apply(model, action)
+            actions = actions[split:]
+            self._compact(model, actions)
+        elif group is not None:
+            # Ação interrompida: as próximas operações não podem entrar no grupo dela
+            self._append(["rollback"])
+        for action in actions:
+            self._apply(model, action)
+        self.undoable = len(actions)
+        return model
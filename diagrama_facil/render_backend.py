@@ -0,0 +1,162 @@
+import os
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from diagrama_facil.render_cache import diagram_key
+
+
+class RenderError(Exception):
+    pass
+
+
+class RenderBackend(ABC):
+    """Interface dos renderizadores de diagrama: recebe PlantUML, devolve bytes."""
+
+    output_format = "png"
+
+    @abstractmethod
+    def render(self, source):
+        ...
+
+    def close(self):
+        pass
+
+
+class KrokiBackend(RenderBackend):
+    """Renderiza via API HTTP do Kroki (público ou auto-hospedado).
+
+    Mantém uma sessão HTTP persistente com pool de conexões, timeout e
+    número limitado de novas tentativas para falhas transitórias.
+    """
+
+    def __init__(self, base_url="https://kroki.io", diagram_type="plantuml", output_format="png",
+                 timeout=(5, 30), retries=2, pool_size=8):
+        self.url = f"{base_url.rstrip('/')}/{diagram_type}/{output_format}"
+        self.output_format = output_format
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def render(self, source):
+        try:
+            response = self.session.post(
+                self.url,
+                data=source.encode("utf-8"),
+                headers={"Content-Type": "text/plain"},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise RenderError(f"Falha ao contatar o renderizador em {self.url}: {e}") from e
+        if response.status_code != 200:
+            raise RenderError(f"O renderizador respondeu com status {response.status_code}.")
+        return response.content
+
+    def close(self):
+        self.session.close()
+
+
+class PlantUMLJarBackend(RenderBackend):
+    """Renderiza localmente com o plantuml.jar (ou outro comando compatível com -pipe)."""
+
+    def __init__(self, jar_path="plantuml.jar", output_format="png", timeout=60, command=None):
+        self.output_format = output_format
+        self.timeout = timeout
+        self.command = command or ["java", "-jar", jar_path, "-pipe", f"-t{output_format}", "-charset", "UTF-8"]
+
+    def render(self, source):
+        try:
+            result = subprocess.run(
+                self.command,
+                input=source.encode("utf-8"),
+                capture_output=True,
+                timeout=self.timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RenderError(f"Falha ao executar o renderizador local: {e}") from e
+        if result.returncode != 0:
+            raise RenderError(result.stderr.decode("utf-8", "replace").strip() or "Erro no renderizador local.")
+        return result.stdout
+
+
+# Escolhe o renderizador a partir das variáveis de ambiente
+def backend_from_config(config=None):
+    config = os.environ if config is None else config
+    renderer = config.get("DIAGRAM_RENDERER", "kroki")
+    timeout = float(config.get("DIAGRAM_RENDER_TIMEOUT", "30"))
+    if renderer == "kroki":
+        return KrokiBackend(
+            base_url=config.get("KROKI_URL", "https://kroki.io"),
+            timeout=(min(5.0, timeout), timeout),
+            retries=int(config.get("DIAGRAM_RENDER_RETRIES", "2")),
+        )
+    if renderer == "plantuml-jar":
+        return PlantUMLJarBackend(jar_path=config.get("PLANTUML_JAR", "plantuml.jar"), timeout=timeout)
+    raise ValueError(f"Renderizador desconhecido: {renderer}")
+
+
+class RenderService:
+    """Executa renderizações fora da thread do script, num pool de workers.
+
+    Consulta o cache antes de enviar ao backend e agrupa pedidos simultâneos
+    do mesmo diagrama numa única renderização.
+    """
+
+    def __init__(self, backend, cache, max_workers=4, instrumentation=None):
+        self.backend = backend
+        self.cache = cache
+        # Opcional: mede cada chamada ao backend (latência do Kroki/plantuml.jar)
+        self.instrumentation = instrumentation
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="diagram-render")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, source):
+        key = diagram_key(source, self.backend.output_format)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+        data = self.cache.get(key)
+        if data is not None:
+            future = Future()
+            future.set_result((key, data))
+            return future
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(self._render, key, source)
+                self._in_flight[key] = future
+        return future
+
+    def _render(self, key, source):
+        try:
+            if self.instrumentation is None:
+                data = self.backend.render(source)
+            else:
+                with self.instrumentation.timer("render", backend=type(self.backend).__name__) as fields:
+                    data = self.backend.render(source)
+                    fields["bytes"] = len(data)
+            self.cache.put(key, data)
+            return key, data
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
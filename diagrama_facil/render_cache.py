@@ -0,0 +1,112 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+# Chave de conteúdo: o mesmo código PlantUML no mesmo formato gera sempre a mesma imagem
+def diagram_key(source, output_format="png"):
+    digest = hashlib.sha256()
+    digest.update(output_format.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiagramCache:
+    """Cache de diagramas renderizados, compartilhado entre sessões.
+
+    Camada em memória com política LRU (limitada por quantidade de entradas e
+    por bytes) e camada opcional em disco, endereçadas pela chave de conteúdo.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _remember(self, key, data):
+        # Chamado com o lock adquirido
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    # Busca nas duas camadas sem contar acertos; devolve (dados, camada)
+    def _lookup(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data, "memory"
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self._remember(key, data)
+                return data, "disk"
+        return None, None
+
+    def get(self, key):
+        data, tier = self._lookup(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if tier == "disk":
+                    self.disk_hits += 1
+        return data
+
+    # Consulta para exibir uma imagem já renderizada: não entra na taxa de acertos
+    def peek(self, key):
+        return self._lookup(key)[0]
+
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escrita atômica para que leitores concorrentes nunca vejam um arquivo parcial
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,226 @@
+import hashlib
+from dataclasses import dataclass, field
+
+from diagrama_facil.generators import entity_sequence_sql, fk_constraint_name
+
+
+@dataclass(slots=True)
+class Column:
+    name: str
+    data_type: str
+    unique: bool = False
+
+    @property
+    def fingerprint(self):
+        return (self.data_type, self.unique)
+
+
+@dataclass(slots=True)
+class ForeignKey:
+    columns: tuple
+    ref_table: str
+    ref_columns: tuple
+    # Nome explícito só nas FKs dos relacionamentos 1:N/1:1; as demais usam o nome padrão
+    name: str | None = None
+
+    # Nome da constraint no banco: o mesmo em generate_sql, no DDL ordenado e nas migrações
+    def constraint_name(self, table):
+        return self.name or fk_constraint_name(table, self.columns)
+
+
+@dataclass(slots=True)
+class Table:
+    name: str
+    columns: dict = field(default_factory=dict)
+    primary_key: tuple = ()
+    foreign_keys: list = field(default_factory=list)
+    _fingerprint: str | None = field(default=None, compare=False, repr=False)
+
+    # Impressão digital da definição completa; tabelas iguais nas duas versões são puladas sem comparar colunas
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            canonical = repr((
+                [(c.name, c.fingerprint) for c in self.columns.values()],
+                self.primary_key,
+                sorted(_fk_key(self.name, fk) for fk in self.foreign_keys),
+            ))
+            self._fingerprint = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+        return self._fingerprint
+
+
+@dataclass(slots=True)
+class Schema:
+    tables: dict = field(default_factory=dict)
+    sequences: dict = field(default_factory=dict)
+
+
+# Esquema físico que generate_sql produz para o modelo (tabelas, colunas, PKs, FKs e sequências)
+def schema_from_model(model):
+    schema = Schema()
+    entities = model.entities
+    for entity_name, entity in entities.items():
+        pk_attrs = [attr.name for attr in entity.pk_attributes]
+        table = Table(entity_name, primary_key=tuple(pk_attrs))
+        for attr in entity.attributes:
+            if attr.is_multivalued:
+                side = Table(f"{entity_name}_{attr.name}")
+                side.columns[f"{entity_name}_id"] = Column(f"{entity_name}_id", entity.primary_key_type)
+                side.columns[attr.name] = Column(attr.name, attr.data_type)
+                if pk_attrs:
+                    side.foreign_keys.append(ForeignKey((f"{entity_name}_id",), entity_name, (pk_attrs[0],)))
+                schema.tables[side.name] = side
+                continue
+            if attr.is_derived:
+                continue
+            table.columns[attr.name] = Column(attr.name, attr.data_type)
+            if attr.is_foreign_key:
+                table.foreign_keys.append(ForeignKey((attr.name,), attr.references, (attr.referenced_attr,)))
+        schema.tables[entity_name] = table
+        sequence_sql = entity_sequence_sql(entity_name, entity)
+        if sequence_sql:
+            schema.sequences[sequence_sql.split()[2]] = sequence_sql
+
+    for rel in model.relationships:
+        parent = entities[rel.entity1]
+        if rel.relationship_type in ("1:N", "1:1"):
+            fk_attr = f"{rel.entity1}_id"
+            table = schema.tables[rel.entity2]
+            table.columns[fk_attr] = Column(fk_attr, parent.primary_key_type, unique=rel.relationship_type == "1:1")
+            table.foreign_keys.append(ForeignKey((fk_attr,), rel.entity1, (parent.primary_key,), f"fk_{rel.entity2}_{rel.entity1}"))
+        elif rel.relationship_type == "N:N":
+            child = entities[rel.entity2]
+            col1, col2 = f"{rel.entity1}_id", f"{rel.entity2}_id"
+            assoc = Table(f"{rel.entity1}_{rel.entity2}", primary_key=(col1, col2))
+            assoc.columns[col1] = Column(col1, parent.primary_key_type)
+            assoc.columns[col2] = Column(col2, child.primary_key_type)
+            assoc.foreign_keys.append(ForeignKey((col1,), rel.entity1, (parent.primary_key,)))
+            assoc.foreign_keys.append(ForeignKey((col2,), rel.entity2, (child.primary_key,)))
+            schema.tables[assoc.name] = assoc
+    return schema
+
+
+def _column_sql(column):
+    return f"{column.name} {column.data_type}{' UNIQUE' if column.unique else ''}"
+
+
+# CREATE TABLE com colunas e PK; `constraints` são linhas extras (as FKs do DDL ordenado)
+def create_table_sql(table, constraints=()):
+    lines = [f"    {_column_sql(column)}" for column in table.columns.values()]
+    if table.primary_key:
+        lines.append(f"    PRIMARY KEY ({', '.join(table.primary_key)})")
+    lines.extend(constraints)
+    return f"CREATE TABLE {table.name} (\n" + ",\n".join(lines) + "\n);\n"
+
+
+def _add_fk_sql(table_name, fk):
+    return (
+        f"ALTER TABLE {table_name} ADD CONSTRAINT {fk.constraint_name(table_name)} "
+        f"FOREIGN KEY ({', '.join(fk.columns)}) REFERENCES {fk.ref_table}({', '.join(fk.ref_columns)});"
+    )
+
+
+def _drop_fk_sql(table_name, fk):
+    return f"ALTER TABLE {table_name} DROP CONSTRAINT {fk.constraint_name(table_name)};"
+
+
+@dataclass(slots=True)
+class SchemaDiff:
+    drop_constraints: list = field(default_factory=list)
+    drop_tables: list = field(default_factory=list)
+    sequences: list = field(default_factory=list)
+    create_tables: list = field(default_factory=list)
+    alter_tables: list = field(default_factory=list)
+    add_constraints: list = field(default_factory=list)
+    unchanged_tables: int = 0
+
+    # Ordem segura: remove constraints e tabelas, cria o que é novo, altera e por fim liga as FKs
+    @property
+    def statements(self):
+        return (self.drop_constraints + self.drop_tables + self.sequences
+                + self.create_tables + self.alter_tables + self.add_constraints)
+
+    def to_sql(self):
+        return "\n".join(self.statements)
+
+
+# FKs iguais e com o mesmo nome efetivo (explícito ou gerado) são a mesma constraint
+def _fk_key(table_name, fk):
+    return (fk.columns, fk.ref_table, fk.ref_columns, fk.constraint_name(table_name))
+
+
+def _diff_table(old, new, diff):
+    name = new.name
+    old_fks = {_fk_key(name, fk): fk for fk in old.foreign_keys}
+    new_fks = {_fk_key(name, fk): fk for fk in new.foreign_keys}
+    for key, fk in old_fks.items():
+        if key not in new_fks and all(column in new.columns for column in fk.columns):
+            diff.drop_constraints.append(_drop_fk_sql(name, fk))
+    if old.primary_key != new.primary_key and old.primary_key:
+        # CASCADE remove também as FKs de outras tabelas que apontam para esta PK; diff_schemas as recria
+        diff.alter_tables.append(f"ALTER TABLE {name} DROP PRIMARY KEY CASCADE;")
+    for column in old.columns.values():
+        if column.name not in new.columns:
+            # CASCADE CONSTRAINTS também remove as FKs apoiadas na coluna
+            diff.alter_tables.append(f"ALTER TABLE {name} DROP COLUMN {column.name} CASCADE CONSTRAINTS;")
+    for column in new.columns.values():
+        previous = old.columns.get(column.name)
+        if previous is None:
+            diff.alter_tables.append(f"ALTER TABLE {name} ADD ({_column_sql(column)});")
+        elif previous.fingerprint != column.fingerprint:
+            if previous.data_type != column.data_type:
+                diff.alter_tables.append(f"ALTER TABLE {name} MODIFY ({column.name} {column.data_type});")
+            if previous.unique != column.unique:
+                action = "ADD UNIQUE" if column.unique else "DROP UNIQUE"
+                diff.alter_tables.append(f"ALTER TABLE {name} {action} ({column.name});")
+    if old.primary_key != new.primary_key and new.primary_key:
+        diff.alter_tables.append(f"ALTER TABLE {name} ADD CONSTRAINT pk_{name} PRIMARY KEY ({', '.join(new.primary_key)});")
+    for key, fk in new_fks.items():
+        if key not in old_fks:
+            diff.add_constraints.append(_add_fk_sql(name, fk))
+
+
+def diff_schemas(old, new):
+    diff = SchemaDiff()
+    for name in old.tables:
+        if name not in new.tables:
+            diff.drop_tables.append(f"DROP TABLE {name} CASCADE CONSTRAINTS;")
+    for name in old.sequences:
+        if name not in new.sequences:
+            diff.sequences.append(f"DROP SEQUENCE {name};")
+    for name, sequence_sql in new.sequences.items():
+        if name not in old.sequences:
+            diff.sequences.append(sequence_sql)
+    for name, table in new.tables.items():
+        previous = old.tables.get(name)
+        if previous is None:
+            diff.create_tables.append(create_table_sql(table))
+            # FKs de tabelas novas ficam para o fim, quando todas as tabelas já existem
+            diff.add_constraints.extend(_add_fk_sql(name, fk) for fk in table.foreign_keys)
+        elif previous.fingerprint == table.fingerprint:
+            diff.unchanged_tables += 1
+        else:
+            _diff_table(previous, table, diff)
+
+    # FKs mantidas que apontam para uma tabela cuja PK foi recriada caíram com o DROP PRIMARY KEY CASCADE
+    rekeyed = {
+        name for name, table in new.tables.items()
+        if name in old.tables and old.tables[name].primary_key and old.tables[name].primary_key != table.primary_key
+    }
+    if rekeyed:
+        for name, table in new.tables.items():
+            previous = old.tables.get(name)
+            if previous is None:
+                continue
+            old_keys = {_fk_key(name, fk) for fk in previous.foreign_keys}
+            for fk in table.foreign_keys:
+                if (fk.ref_table in rekeyed and _fk_key(name, fk) in old_keys
+                        and all(column in new.tables[fk.ref_table].columns for column in fk.ref_columns)):
+                    diff.add_constraints.append(_add_fk_sql(name, fk))
+    return diff
+
+
+# Script de migração mínimo que leva o banco da versão `old_model` para `new_model`.
+# As FKs são referenciadas pelos nomes de ForeignKey.constraint_name, os mesmos de generate_sql e do DDL ordenado.
+def generate_migration(old_model, new_model):
+    return diff_schemas(schema_from_model(old_model), schema_from_model(new_model)).to_sql()
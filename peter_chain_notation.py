@@ -1,128 +1,237 @@
+import contextlib
+import functools
+import io
+import os
+import re
+import uuid
+
 import streamlit as st
-import requests
+
+from diagrama_facil.ddl_plan import plan_ddl
+from diagrama_facil.generators import (
+    FragmentMemo,
+    generate_logical_model,
+    generate_plantuml_diagram,
+    generate_sql,
+)
+from diagrama_facil.instrumentation import Instrumentation, estimate_size, jsonl_file_hook
+from diagrama_facil.importer import SchemaImportError, format_for_filename, import_stream
+from diagrama_facil.model import Attribute, ERModel, ModelError, Relationship
+from diagrama_facil.normalization import apply_decomposition, entity_columns, normalize_entity
+from diagrama_facil.partition import DEFAULT_AREA_SIZE, area_diagrams
+from diagrama_facil.persistence import EditLog, PersistenceError, model_from_bytes, model_to_bytes
+from diagrama_facil.render_backend import RenderError, RenderService, backend_from_config
+from diagrama_facil.render_cache import DiagramCache
+from diagrama_facil.schema_diff import generate_migration
 
 st.set_page_config(page_title="Modelagem e Normalização de Dados", layout="wide")
 st.title("🗂️ Diagrama Fácil")
 
-# Função para gerar SQL no padrão Oracle
-def generate_sql(entities, relationships):
-    sql_statements = []
-    sequence_statements = []
-    for entity_name, entity in entities.items():
-        attrs = entity['attributes']
-        is_weak = entity['is_weak']
-        supertype = entity['supertype']
-        subtypes = entity['subtypes']
-        
-        sql = f"CREATE TABLE {entity_name} (\n"
-        pk_attrs = [attr['name'] for attr in attrs if attr['is_primary_key']]
-        fk_statements = []
-        for attr in attrs:
-            line = f"    {attr['name']} {attr['data_type']}"
-            if attr['is_primary_key'] and not is_weak:
-                line += " PRIMARY KEY"
-            if attr['is_multivalued']:
-                # Em Oracle, atributos multivalorados podem ser modelados em tabelas separadas
-                multivalued_table = f"{entity_name}_{attr['name']}"
-                multivalued_sql = f"CREATE TABLE {multivalued_table} (\n"
-                multivalued_sql += f"    {entity_name}_id {entities[entity_name]['primary_key_type']},\n"
-                multivalued_sql += f"    {attr['name']} {attr['data_type']},\n"
-                multivalued_sql += f"    FOREIGN KEY ({entity_name}_id) REFERENCES {entity_name}({pk_attrs[0]})\n"
-                multivalued_sql += ");\n"
-                sql_statements.append(multivalued_sql)
-                continue  # Não incluir o atributo na tabela principal
-            if attr['is_derived']:
-                # Atributos derivados não são armazenados no banco, podem ser calculados via VIEW
+# Cache de diagramas compartilhado por todas as sessões do servidor
+@st.cache_resource
+def get_diagram_cache():
+    return DiagramCache(
+        max_entries=int(os.environ.get("DIAGRAM_CACHE_ENTRIES", "128")),
+        disk_dir=os.environ.get("DIAGRAM_CACHE_DIR") or None,
+    )
+
+# Gancho que grava as métricas em JSON Lines para o monitoramento (DIAGRAM_METRICS_LOG=<arquivo>)
+@st.cache_resource
+def get_metrics_hook():
+    path = os.environ.get("DIAGRAM_METRICS_LOG")
+    return jsonl_file_hook(path) if path else None
+
+# Métricas do servidor: latência das renderizações, compartilhadas por todas as sessões
+@st.cache_resource
+def get_render_metrics():
+    metrics = Instrumentation(context={"scope": "server"})
+    if get_metrics_hook() is not None:
+        metrics.add_hook(get_metrics_hook())
+    return metrics
+
+# Renderizador (Kroki, Kroki auto-hospedado ou plantuml.jar local) com pool de workers compartilhado
+@st.cache_resource
+def get_render_service():
+    return RenderService(
+        backend_from_config(),
+        get_diagram_cache(),
+        max_workers=int(os.environ.get("DIAGRAM_RENDER_WORKERS", "4")),
+        instrumentation=get_render_metrics(),
+    )
+
+# Saídas pesadas ficam guardadas junto da revisão do modelo que as gerou
+def cached_output(name, build):
+    model = st.session_state.model
+    cached = st.session_state.get(name)
+    if cached is None or cached[0] != model.revision:
+        with st.session_state.metrics.timer(name):
+            cached = (model.revision, build())
+        st.session_state[name] = cached
+    return cached[1]
+
+# Mede cada execução da seção; um rerun só do fragmento (fora do script completo) conta como uma execução própria
+def timed_section(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = st.session_state.metrics
+        fragment_only = not metrics.in_rerun
+        if fragment_only:
+            metrics.start_rerun()
+        try:
+            with metrics.timer(f"section.{func.__name__}"):
+                return func(*args, **kwargs)
+        finally:
+            if fragment_only:
+                metrics.finish_rerun("rerun.fragment", fragment=func.__name__)
+    return wrapper
+
+# Exibe o diagrama; enquanto a renderização não termina, o painel se atualiza sozinho
+def show_diagram(polling=False):
+    future = st.session_state.get('diagram_future')
+    if future is not None and future.done():
+        del st.session_state['diagram_future']
+        try:
+            st.session_state.diagram_key, _ = future.result()
+            st.session_state.pop('diagram_error', None)
+        except RenderError as e:
+            st.session_state.diagram_error = str(e)
+        if polling:
+            # Renderização concluída: rerun completo para interromper a atualização periódica
+            st.rerun()
+        future = None
+
+    st.subheader("Diagrama ER")
+    if future is not None:
+        st.info("⏳ Renderizando o diagrama...")
+    elif 'diagram_error' in st.session_state:
+        st.error(f"Erro ao gerar o diagrama. {st.session_state.diagram_error}")
+    elif 'diagram_key' in st.session_state:
+        image = get_diagram_cache().peek(st.session_state.diagram_key)
+        if image is not None:
+            st.image(image)
+        else:
+            # A imagem saiu do cache: renderizar novamente a partir do código guardado
+            st.session_state.diagram_future = get_render_service().submit(st.session_state.plantuml_code)
+            st.rerun()
+
+# Exibe a visão geral e as áreas em abas, cada uma assim que a sua renderização termina
+def show_area_diagrams(polling=False):
+    futures = st.session_state.area_futures
+    results = st.session_state.area_results
+    for i, future in list(futures.items()):
+        if future.done():
+            del futures[i]
+            try:
+                results[i] = (future.result()[0], None)
+            except RenderError as e:
+                results[i] = (None, str(e))
+    if polling and not futures:
+        # Todas as áreas concluídas: rerun completo para interromper a atualização periódica
+        st.rerun()
+
+    st.subheader("Diagrama ER por áreas")
+    for i, tab in enumerate(st.tabs(st.session_state.area_titles)):
+        with tab:
+            if i in futures:
+                st.info("⏳ Renderizando o diagrama...")
+                continue
+            key, error = results[i]
+            if error is not None:
+                st.error(f"Erro ao gerar o diagrama. {error}")
                 continue
-            sql += line + ",\n"
-            if attr['is_foreign_key']:
-                fk = f"FOREIGN KEY ({attr['name']}) REFERENCES {attr['references']}({attr['referenced_attr']})"
-                fk_statements.append(fk)
-        # Remover a última vírgula
-        sql = sql.rstrip(",\n") + "\n"
-        if is_weak:
-            # Chave primária composta para entidades fracas
-            pk = ", ".join(pk_attrs)
-            sql += f",    PRIMARY KEY ({pk})\n"
-        if fk_statements:
-            sql += ",\n    " + ",\n    ".join(fk_statements) + "\n"
-        sql += ");\n"
-        sql_statements.append(sql)
-
-        # Criar sequência para chave primária se for numérica
-        for attr in attrs:
-            if attr['is_primary_key'] and attr['data_type'].upper() in ('NUMBER', 'INT', 'INTEGER'):
-                sequence_name = f"{entity_name}_{attr['name']}_seq"
-                sequence_sql = f"CREATE SEQUENCE {sequence_name} START WITH 1 INCREMENT BY 1 NOCACHE NOCYCLE;"
-                sequence_statements.append(sequence_sql)
-                break  # Considerando apenas uma sequência por tabela
-
-    # Adicionar relacionamentos
-    for rel in relationships:
-        if rel["relationship_type"] == "1:N":
-            # Adicionar FK na tabela "N"
-            fk_attr = f"{rel['entity1']}_id"
-            fk_sql = f"ALTER TABLE {rel['entity2']} ADD ({fk_attr} {entities[rel['entity1']]['primary_key_type']});\n"
-            fk_sql += f"ALTER TABLE {rel['entity2']} ADD CONSTRAINT fk_{rel['entity2']}_{rel['entity1']} FOREIGN KEY ({fk_attr}) REFERENCES {rel['entity1']}({entities[rel['entity1']]['primary_key']});\n"
-            sql_statements.append(fk_sql)
-        elif rel["relationship_type"] == "N:N":
-            # Criar tabela associativa
-            assoc_table = f"{rel['entity1']}_{rel['entity2']}"
-            pk1 = entities[rel['entity1']]['primary_key']
-            pk2 = entities[rel['entity2']]['primary_key']
-            pk1_type = entities[rel['entity1']]['primary_key_type']
-            pk2_type = entities[rel['entity2']]['primary_key_type']
-            sql = f"CREATE TABLE {assoc_table} (\n"
-            sql += f"    {rel['entity1']}_id {pk1_type},\n"
-            sql += f"    {rel['entity2']}_id {pk2_type},\n"
-            sql += f"    PRIMARY KEY ({rel['entity1']}_id, {rel['entity2']}_id),\n"
-            sql += f"    FOREIGN KEY ({rel['entity1']}_id) REFERENCES {rel['entity1']}({pk1}),\n"
-            sql += f"    FOREIGN KEY ({rel['entity2']}_id) REFERENCES {rel['entity2']}({pk2})\n"
-            sql += ");\n"
-            sql_statements.append(sql)
-        elif rel["relationship_type"] == "1:1":
-            # Em relacionamentos 1:1, a chave estrangeira pode ficar em qualquer tabela
-            fk_attr = f"{rel['entity1']}_id"
-            fk_sql = f"ALTER TABLE {rel['entity2']} ADD ({fk_attr} {entities[rel['entity1']]['primary_key_type']} UNIQUE);\n"
-            fk_sql += f"ALTER TABLE {rel['entity2']} ADD CONSTRAINT fk_{rel['entity2']}_{rel['entity1']} FOREIGN KEY ({fk_attr}) REFERENCES {rel['entity1']}({entities[rel['entity1']]['primary_key']});\n"
-            sql_statements.append(fk_sql)
-    # Retornar sequência e statements
-    return "\n".join(sequence_statements + sql_statements)
-
-# Função para gerar diagrama PlantUML
-def generate_plantuml_diagram(entities, relationships):
-    uml = "@startuml\n!define ER_TOP_DOWN\n' Configurações de estilo\nhide circle\nskinparam linetype ortho\n"
-    # Definir entidades e seus atributos
-    for entity_name, entity in entities.items():
-        attrs = entity['attributes']
-        uml += f"entity \"{entity_name}\" as {entity_name} {{\n"
-        for attr in attrs:
-            if attr['is_primary_key']:
-                uml += f"  * {attr['name']} : {attr['data_type']}\n"  # Chave primária
-            elif attr['is_foreign_key']:
-                uml += f"  + {attr['name']} : {attr['data_type']}\n"  # Chave estrangeira
+            image = get_diagram_cache().peek(key)
+            if image is not None:
+                st.image(image)
             else:
-                uml += f"  {attr['name']} : {attr['data_type']}\n"
-        uml += "}\n"
-        # Generalização/especialização
-        if entity['supertype']:
-            uml += f"{entity_name} --|> {entity['supertype']}\n"
-        for subtype in entity['subtypes']:
-            uml += f"{subtype} --|> {entity_name}\n"
-    # Definir relacionamentos
-    for rel in relationships:
-        ent1 = rel['entity1']
-        ent2 = rel['entity2']
-        rel_name = rel['relationship_name']
-        rel_type = rel['relationship_type']
-        if rel_type == '1:1':
-            uml += f"{ent1} ||--|| {ent2} : \"{rel_name}\"\n"
-        elif rel_type == '1:N':
-            uml += f"{ent1} ||--o{{ {ent2} : \"{rel_name}\"\n"
-        elif rel_type == 'N:N':
-            uml += f"{ent1} }}o--o{{ {ent2} : \"{rel_name}\"\n"
-    uml += "@enduml"
-    return uml
+                # A imagem saiu do cache: renderizar novamente só esta área
+                futures[i] = get_render_service().submit(st.session_state.area_sources[i])
+                st.rerun()
+
+# Registro de alterações da sessão, identificado pelo parâmetro "sessao" da URL;
+# reabrir a mesma URL (inclusive após reiniciar o servidor) recupera o modelo
+def open_edit_log():
+    log_dir = os.environ.get("DIAGRAM_EDIT_LOG_DIR", ".diagrama_facil/sessoes")
+    if not log_dir:
+        return None
+    session_id = st.query_params.get("sessao", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["sessao"] = session_id
+    return EditLog(os.path.join(log_dir, f"{session_id}.jsonl"))
+
+# Troca o modelo da sessão, mantendo o registro de alterações conectado a ele
+def set_model(model):
+    if st.session_state.edit_log is not None:
+        model.subscribe(st.session_state.edit_log.record)
+    st.session_state.model = model
+
+# Alterações feitas dentro do bloco são desfeitas de uma vez (ex.: uma decomposição inteira)
+def model_action():
+    edit_log = st.session_state.edit_log
+    return edit_log.action() if edit_log is not None else contextlib.nullcontext()
+
+if 'model' not in st.session_state:
+    # Entidades e relacionamentos, com índices de PK e de relacionamentos
+    st.session_state.edit_log = open_edit_log()
+    set_model(st.session_state.edit_log.replay() if st.session_state.edit_log is not None else ERModel())
+if 'fragment_memo' not in st.session_state:
+    # Fragmentos de SQL/PlantUML/modelo lógico memoizados pela versão de cada entidade e relacionamento
+    st.session_state.fragment_memo = FragmentMemo()
+if 'metrics' not in st.session_state:
+    # Tempos desta sessão: execuções, seções e geradores
+    st.session_state.metrics = Instrumentation(context={"session": st.query_params.get("sessao") or uuid.uuid4().hex})
+    if get_metrics_hook() is not None:
+        st.session_state.metrics.add_hook(get_metrics_hook())
+st.session_state.metrics.start_rerun()
+
+# Barra lateral: exportar, importar e desfazer
+with st.sidebar:
+    st.header("💾 Modelo")
+    st.download_button(
+        label="🔽 Exportar Modelo",
+        # Gerado só no clique, a partir do modelo atual (inclusive alterações feitas dentro de fragmentos)
+        data=functools.partial(model_to_bytes, st.session_state.model),
+        file_name="modelo.dfz",
+        mime="application/gzip"
+    )
+    uploaded_model = st.file_uploader("Importar Modelo", type=["dfz", "json", "gz"])
+    if uploaded_model is not None and st.button("Carregar Modelo"):
+        try:
+            model = model_from_bytes(uploaded_model.getvalue())
+        except PersistenceError as e:
+            st.error(str(e))
+        else:
+            if st.session_state.edit_log is not None:
+                st.session_state.edit_log.checkpoint(model)
+            set_model(model)
+            st.rerun()
+    # Engenharia reversa de um esquema existente: script DDL Oracle ou catálogo de colunas
+    uploaded_schema = st.file_uploader("Importar Esquema (DDL ou catálogo)", type=["sql", "ddl", "csv", "json", "jsonl"])
+    if uploaded_schema is not None and st.button("Importar Esquema"):
+        kind = format_for_filename(uploaded_schema.name)
+        uploaded_schema.seek(0)
+        # O arquivo é lido em fluxo, sem montar uma única string com o conteúdo
+        stream = io.TextIOWrapper(uploaded_schema, encoding="utf-8", errors="replace", newline="" if kind == "csv" else None)
+        try:
+            model, report = import_stream(stream, kind)
+        except SchemaImportError as e:
+            st.error(str(e))
+        else:
+            if st.session_state.edit_log is not None:
+                st.session_state.edit_log.checkpoint(model)
+            set_model(model)
+            st.session_state.import_message = report.summary()
+            st.rerun()
+        finally:
+            stream.detach()
+    if 'import_message' in st.session_state:
+        st.success(st.session_state.pop('import_message'))
+    edit_log = st.session_state.edit_log
+    if edit_log is not None:
+        if st.button("↩️ Desfazer Última Alteração", disabled=not edit_log.undoable):
+            edit_log.undo()
+            set_model(edit_log.replay())
+            st.rerun()
 
 # Sessão 1: Definição das Entidades
 st.header("1. Definir Entidades")
@@ -135,88 +244,92 @@ with st.expander("📖 O que é uma Entidade?"):
     Exemplos incluem **Cliente**, **Produto**, **Pedido**, etc.
     """)
 
-if 'entities' not in st.session_state:
-    st.session_state.entities = {}
-
-with st.form("entity_form", clear_on_submit=True):
-    entity_name = st.text_input("Nome da Entidade", placeholder="Exemplo: Cliente")
-    is_weak = st.checkbox("Entidade Fraca?")
-    supertype = st.selectbox("Especialização de", ["Nenhum"] + list(st.session_state.entities.keys()))
-    submitted = st.form_submit_button("Adicionar Entidade")
-    if submitted:
-        if entity_name:
-            if entity_name in st.session_state.entities:
-                st.warning(f"A entidade '{entity_name}' já existe.")
+# Cada seção é um fragmento: interações nela só re-executam a própria seção
+@st.fragment
+@timed_section
+def entity_section():
+    model = st.session_state.model
+    with st.form("entity_form", clear_on_submit=True):
+        entity_name = st.text_input("Nome da Entidade", placeholder="Exemplo: Cliente")
+        is_weak = st.checkbox("Entidade Fraca?")
+        supertype = st.selectbox("Especialização de", ["Nenhum"] + list(model.entities.keys()))
+        submitted = st.form_submit_button("Adicionar Entidade")
+        if submitted:
+            if entity_name:
+                if entity_name in model.entities:
+                    st.warning(f"A entidade '{entity_name}' já existe.")
+                else:
+                    model.add_entity(entity_name, is_weak=is_weak, supertype=supertype if supertype != "Nenhum" else None)
+                    st.session_state.entity_message = f"Entidade '{entity_name}' adicionada com sucesso!"
+                    # As demais seções listam as entidades: é preciso um rerun completo da página
+                    st.rerun()
             else:
-                st.session_state.entities[entity_name] = {
-                    'attributes': [],
-                    'is_weak': is_weak,
-                    'supertype': supertype if supertype != "Nenhum" else None,
-                    'subtypes': [],
-                    'primary_key': None,
-                    'primary_key_type': None
-                }
-                if supertype != "Nenhum":
-                    st.session_state.entities[supertype]['subtypes'].append(entity_name)
-                st.success(f"Entidade '{entity_name}' adicionada com sucesso!")
-        else:
-            st.error("Por favor, preencha o nome da entidade.")
+                st.error("Por favor, preencha o nome da entidade.")
+        if 'entity_message' in st.session_state:
+            st.success(st.session_state.pop('entity_message'))
+
+entity_section()
 
 # Sessão para adicionar atributos às entidades
 st.header("1.1. Definir Atributos das Entidades")
 st.write("Adicione atributos às entidades definidas.")
 
-if st.session_state.entities:
-    entity_to_edit = st.selectbox("Selecionar Entidade", list(st.session_state.entities.keys()))
-    with st.form("attribute_form", clear_on_submit=True):
-        attr_name = st.text_input("Nome do Atributo", placeholder="Exemplo: id_cliente")
-        attr_type = st.selectbox("Tipo de Dado", ["VARCHAR2(255)", "NUMBER", "DATE", "CHAR(1)", "CLOB", "BLOB"])
-        is_primary_key = st.checkbox("Chave Primária?")
-        is_foreign_key = st.checkbox("Chave Estrangeira?")
-        is_multivalued = st.checkbox("Atributo Multivalorado?")
-        is_derived = st.checkbox("Atributo Derivado?")
-        submitted_attr = st.form_submit_button("Adicionar Atributo")
-        if submitted_attr:
-            if attr_name and attr_type:
-                attribute = {
-                    'name': attr_name,
-                    'data_type': attr_type,
-                    'is_primary_key': is_primary_key,
-                    'is_foreign_key': is_foreign_key,
-                    'is_multivalued': is_multivalued,
-                    'is_derived': is_derived,
-                    'references': None,
-                    'referenced_attr': None
-                }
-                if is_primary_key:
-                    if st.session_state.entities[entity_to_edit]['primary_key']:
+# Editor de atributos (re-executa só esta seção)
+@st.fragment
+@timed_section
+def attribute_section():
+    model = st.session_state.model
+    if model.entities:
+        entity_to_edit = st.selectbox("Selecionar Entidade", list(model.entities.keys()))
+        with st.form("attribute_form", clear_on_submit=True):
+            attr_name = st.text_input("Nome do Atributo", placeholder="Exemplo: id_cliente")
+            attr_type = st.selectbox("Tipo de Dado", ["VARCHAR2(255)", "NUMBER", "DATE", "CHAR(1)", "CLOB", "BLOB"])
+            is_primary_key = st.checkbox("Chave Primária?")
+            is_foreign_key = st.checkbox("Chave Estrangeira?")
+            is_multivalued = st.checkbox("Atributo Multivalorado?")
+            is_derived = st.checkbox("Atributo Derivado?")
+            submitted_attr = st.form_submit_button("Adicionar Atributo")
+            if submitted_attr:
+                if attr_name and attr_type:
+                    attribute = Attribute(
+                        name=attr_name,
+                        data_type=attr_type,
+                        is_primary_key=is_primary_key,
+                        is_foreign_key=is_foreign_key,
+                        is_multivalued=is_multivalued,
+                        is_derived=is_derived
+                    )
+                    if is_foreign_key:
+                        ref_entity = st.selectbox("Referenciar Entidade", list(model.entities.keys()))
+                        ref_attr = st.selectbox("Referenciar Atributo", [attr.name for attr in model.pk_attributes(ref_entity)])
+                        attribute.references = ref_entity
+                        attribute.referenced_attr = ref_attr
+                    if not model.add_attribute(entity_to_edit, attribute):
                         st.warning(f"A entidade '{entity_to_edit}' já possui uma chave primária.")
                     else:
-                        st.session_state.entities[entity_to_edit]['primary_key'] = attr_name
-                        st.session_state.entities[entity_to_edit]['primary_key_type'] = attr_type
-                if is_foreign_key:
-                    ref_entity = st.selectbox("Referenciar Entidade", list(st.session_state.entities.keys()))
-                    ref_attr = st.selectbox("Referenciar Atributo", [attr['name'] for attr in st.session_state.entities[ref_entity]['attributes'] if attr['is_primary_key']])
-                    attribute['references'] = ref_entity
-                    attribute['referenced_attr'] = ref_attr
-                st.session_state.entities[entity_to_edit]['attributes'].append(attribute)
-                st.success(f"Atributo '{attr_name}' adicionado à entidade '{entity_to_edit}'.")
-            else:
-                st.error("Por favor, preencha o nome do atributo e selecione o tipo de dado.")
-
-    # Exibir atributos da entidade selecionada
-    st.subheader(f"Atributos da Entidade '{entity_to_edit}':")
-    for attr in st.session_state.entities[entity_to_edit]['attributes']:
-        details = f"{attr['name']} ({attr['data_type']})"
-        if attr['is_primary_key']:
-            details += " [PK]"
-        if attr['is_foreign_key']:
-            details += f" [FK -> {attr['references']}({attr['referenced_attr']})]"
-        if attr['is_multivalued']:
-            details += " [Multivalorado]"
-        if attr['is_derived']:
-            details += " [Derivado]"
-        st.write(details)
+                        st.session_state.attribute_message = f"Atributo '{attr_name}' adicionado à entidade '{entity_to_edit}'."
+                        # Diagrama, SQL, normalização e o botão de desfazer dependem do modelo: rerun completo
+                        st.rerun()
+                else:
+                    st.error("Por favor, preencha o nome do atributo e selecione o tipo de dado.")
+            if 'attribute_message' in st.session_state:
+                st.success(st.session_state.pop('attribute_message'))
+
+        # Exibir atributos da entidade selecionada
+        st.subheader(f"Atributos da Entidade '{entity_to_edit}':")
+        for attr in model.entities[entity_to_edit].attributes:
+            details = f"{attr.name} ({attr.data_type})"
+            if attr.is_primary_key:
+                details += " [PK]"
+            if attr.is_foreign_key:
+                details += f" [FK -> {attr.references}({attr.referenced_attr})]"
+            if attr.is_multivalued:
+                details += " [Multivalorado]"
+            if attr.is_derived:
+                details += " [Derivado]"
+            st.write(details)
+
+attribute_section()
 
 # Sessão 2: Definir Relacionamentos
 st.header("2. Definir Relacionamentos")
@@ -237,124 +350,114 @@ with st.expander("📖 O que é um Relacionamento?"):
     - **N:N (Muitos para Muitos):** Múltiplas instâncias de uma entidade estão relacionadas a múltiplas instâncias de outra entidade.
     """)
 
-if 'relationships' not in st.session_state:
-    st.session_state.relationships = []
-
-if len(st.session_state.entities) >= 2:
-    with st.form("relationship_form", clear_on_submit=True):
-        entity_1 = st.selectbox("Entidade 1", list(st.session_state.entities.keys()))
-        entity_2 = st.selectbox("Entidade 2", list(st.session_state.entities.keys()))
-        relationship_type = st.radio("Tipo de Relacionamento", ["1:1", "1:N", "N:N"])
-        relationship_name = st.text_input(
-            "Nome do Relacionamento",
-            placeholder="Exemplo: realiza, contém, gerencia"
-        )
-        participation = st.radio("Participação da Entidade 1", ["Total", "Parcial"])
-        participation2 = st.radio("Participação da Entidade 2", ["Total", "Parcial"])
-        # Explicação opcional sobre o Nome do Relacionamento
-        with st.expander("📖 O que é o 'Nome do Relacionamento'?"):
-            st.write("""
-            O **"Nome do Relacionamento"** descreve como as duas entidades estão conectadas ou interagem no seu modelo de dados. Pense em verbos ou frases que indicam a ação ou a associação entre elas.
-
-            **Exemplos de Nomes de Relacionamento:**
-            - **Cliente** **realiza** **Pedido**
-            - **Pedido** **contém** **Produto**
-            - **Funcionário** **gerencia** **Departamento**
-            """)
-        submitted_rel = st.form_submit_button("Adicionar Relacionamento")
-        if submitted_rel:
-            if entity_1 and entity_2 and relationship_name:
-                if entity_1 == entity_2:
-                    st.error("Não é permitido relacionar uma entidade consigo mesma.")
-                else:
-                    # Verificar se o relacionamento já existe
-                    exists = False
-                    for rel in st.session_state.relationships:
-                        if (rel["entity1"] == entity_1 and rel["entity2"] == entity_2 and rel["relationship_name"] == relationship_name):
-                            exists = True
-                            break
-                    if exists:
-                        st.warning("Este relacionamento já foi adicionado.")
+# Editor de relacionamentos (re-executa só esta seção)
+@st.fragment
+@timed_section
+def relationship_section():
+    model = st.session_state.model
+    if len(model.entities) >= 2:
+        with st.form("relationship_form", clear_on_submit=True):
+            entity_1 = st.selectbox("Entidade 1", list(model.entities.keys()))
+            entity_2 = st.selectbox("Entidade 2", list(model.entities.keys()))
+            relationship_type = st.radio("Tipo de Relacionamento", ["1:1", "1:N", "N:N"])
+            relationship_name = st.text_input(
+                "Nome do Relacionamento",
+                placeholder="Exemplo: realiza, contém, gerencia"
+            )
+            participation = st.radio("Participação da Entidade 1", ["Total", "Parcial"])
+            participation2 = st.radio("Participação da Entidade 2", ["Total", "Parcial"])
+            # Explicação opcional sobre o Nome do Relacionamento
+            with st.expander("📖 O que é o 'Nome do Relacionamento'?"):
+                st.write("""
+                O **"Nome do Relacionamento"** descreve como as duas entidades estão conectadas ou interagem no seu modelo de dados. Pense em verbos ou frases que indicam a ação ou a associação entre elas.
+
+                **Exemplos de Nomes de Relacionamento:**
+                - **Cliente** **realiza** **Pedido**
+                - **Pedido** **contém** **Produto**
+                - **Funcionário** **gerencia** **Departamento**
+                """)
+            submitted_rel = st.form_submit_button("Adicionar Relacionamento")
+            if submitted_rel:
+                if entity_1 and entity_2 and relationship_name:
+                    if entity_1 == entity_2:
+                        st.error("Não é permitido relacionar uma entidade consigo mesma.")
                     else:
-                        st.session_state.relationships.append({
-                            "entity1": entity_1,
-                            "entity2": entity_2,
-                            "relationship_name": relationship_name,
-                            "relationship_type": relationship_type,
-                            "participation": participation,
-                            "participation2": participation2
-                        })
-                        st.success(f"Relacionamento '{entity_1} - {relationship_name} - {entity_2}' adicionado com sucesso!")
-            else:
-                st.error("Por favor, preencha todas as informações do relacionamento.")
+                        # Verificar se o relacionamento já existe (consulta ao índice do modelo)
+                        if model.has_relationship(entity_1, entity_2, relationship_name):
+                            st.warning("Este relacionamento já foi adicionado.")
+                        else:
+                            model.add_relationship(Relationship(
+                                entity1=entity_1,
+                                entity2=entity_2,
+                                relationship_name=relationship_name,
+                                relationship_type=relationship_type,
+                                participation=participation,
+                                participation2=participation2
+                            ))
+                            st.session_state.relationship_message = f"Relacionamento '{entity_1} - {relationship_name} - {entity_2}' adicionado com sucesso!"
+                            # Diagrama, SQL e o botão de desfazer dependem do modelo: rerun completo
+                            st.rerun()
+                else:
+                    st.error("Por favor, preencha todas as informações do relacionamento.")
+            if 'relationship_message' in st.session_state:
+                st.success(st.session_state.pop('relationship_message'))
 
-# Exibir relacionamentos definidos
-if st.session_state.relationships:
-    st.subheader("Relacionamentos Definidos:")
-    for rel in st.session_state.relationships:
-        st.markdown(f"**{rel['entity1']}** ({rel['participation']}) {rel['relationship_type']} **{rel['relationship_name']}** **{rel['entity2']}** ({rel['participation2']})")
+        # Exibir relacionamentos definidos
+        if model.relationships:
+            st.subheader("Relacionamentos Definidos:")
+            for rel in model.relationships:
+                st.markdown(f"**{rel.entity1}** ({rel.participation}) {rel.relationship_type} **{rel.relationship_name}** **{rel.entity2}** ({rel.participation2})")
+
+relationship_section()
 
 # Sessão 3: Gerar Diagrama e SQL
 st.header("3. Gerar Diagrama, Modelo Lógico e SQL")
 
 col1, col2 = st.columns(2)
 
-with col1:
+# Painel do diagrama e do modelo lógico; atualiza-se periodicamente enquanto há renderização pendente
+@timed_section
+def diagram_panel(polling=False):
+    model = st.session_state.model
+    split = st.checkbox(
+        "Dividir em áreas de assunto", key="diagram_split",
+        help=f"Indicado para modelos grandes: cada área (até {DEFAULT_AREA_SIZE} entidades) vira um diagrama renderizado em paralelo, com uma visão geral ligando as áreas."
+    )
     if st.button("Gerar Diagrama e Modelo Lógico"):
-        if not st.session_state.entities:
+        if not model.entities:
             st.error("Adicione pelo menos uma entidade para gerar o diagrama.")
         else:
-            # Gerar Diagrama ER usando PlantUML via Kroki API
-            plantuml_code = generate_plantuml_diagram(st.session_state.entities, st.session_state.relationships)
-            st.session_state.plantuml_code = plantuml_code
-
-            # Enviar código para a API do Kroki
-            url = "https://kroki.io/plantuml/png"
-            response = requests.post(url, data=plantuml_code.encode('utf-8'))
-
-            if response.status_code == 200:
-                st.subheader("Diagrama ER")
-                st.image(response.content)
-                st.session_state.diagram_image = response.content  # Armazenar a imagem no session_state
-            else:
-                st.error("Erro ao gerar o diagrama.")
-
             # Geração do Modelo Lógico
-            st.subheader("Modelo Lógico")
-            logical_model = ""
-            for entity_name, entity in st.session_state.entities.items():
-                logical_model += f"**Tabela `{entity_name}`**\n"
-                for attr in entity['attributes']:
-                    details = f"- `{attr['name']}` {attr['data_type']}"
-                    if attr['is_primary_key']:
-                        details += " (PRIMARY KEY)"
-                    if attr['is_foreign_key']:
-                        details += f" (FOREIGN KEY -> `{attr['references']}`)"
-                    if attr['is_multivalued']:
-                        details += " (Multivalorado)"
-                    if attr['is_derived']:
-                        details += " (Derivado)"
-                    logical_model += details + "\n"
-                logical_model += "\n"
-            for rel in st.session_state.relationships:
-                if rel["relationship_type"] == "1:N":
-                    logical_model += f"- Chave estrangeira `{rel['entity1']}_id` em `{rel['entity2']}` referenciando `{rel['entity1']}`\n"
-                elif rel["relationship_type"] == "N:N":
-                    logical_model += f"- Tabela associativa `{rel['entity1']}_{rel['entity2']}` com FKs para `{rel['entity1']}` e `{rel['entity2']}`\n"
-            st.markdown(logical_model)
-            st.session_state.logical_model = logical_model  # Armazenar o modelo lógico no session_state
-    else:
-        # Se o diagrama já foi gerado, exibi-lo
-        if 'diagram_image' in st.session_state:
-            st.subheader("Diagrama ER")
-            st.image(st.session_state.diagram_image)
-            st.subheader("Modelo Lógico")
-            st.markdown(st.session_state.logical_model)
-        else:
-            st.info("Clique em 'Gerar Diagrama e Modelo Lógico' para visualizar o diagrama.")
+            st.session_state.logical_model = cached_output('logical_model_output', lambda: generate_logical_model(model.entities, model.relationships, st.session_state.fragment_memo))
 
-with col2:
+            # Renderizar em segundo plano; o modelo lógico e o SQL não esperam pelo Kroki
+            for key in ('diagram_key', 'diagram_error', 'diagram_future', 'area_titles', 'area_futures', 'area_results'):
+                st.session_state.pop(key, None)
+            if split:
+                # Uma renderização por área; só as áreas alteradas não estão no cache
+                diagrams = cached_output('area_output', lambda: area_diagrams(model, memo=st.session_state.fragment_memo))
+                st.session_state.plantuml_code = "\n".join(source for _, source in diagrams)
+                st.session_state.area_titles = [title for title, _ in diagrams]
+                st.session_state.area_sources = [source for _, source in diagrams]
+                st.session_state.area_results = {}
+                st.session_state.area_futures = {i: get_render_service().submit(source) for i, (_, source) in enumerate(diagrams)}
+                pending = not all(future.done() for future in st.session_state.area_futures.values())
+            else:
+                # Gerar Diagrama ER usando PlantUML (reaproveitado se o modelo não mudou)
+                plantuml_code = cached_output('plantuml_output', lambda: generate_plantuml_diagram(model.entities, model.relationships, st.session_state.fragment_memo))
+                st.session_state.plantuml_code = plantuml_code
+                st.session_state.diagram_future = get_render_service().submit(plantuml_code)
+                pending = not st.session_state.diagram_future.done()
+            if pending:
+                # Rerun completo para ativar a atualização periódica do painel
+                st.rerun()
+
+    # Se o diagrama já foi gerado (ou está sendo renderizado), exibi-lo
     if 'plantuml_code' in st.session_state:
+        if 'area_titles' in st.session_state:
+            show_area_diagrams(polling)
+        else:
+            show_diagram(polling)
         # Botão para baixar o código PlantUML
         st.download_button(
             label="🔽 Baixar Diagrama (PlantUML)",
@@ -362,14 +465,28 @@ with col2:
             file_name="diagrama_er.puml",
             mime="text/plain"
         )
+        st.subheader("Modelo Lógico")
+        st.markdown(st.session_state.logical_model)
+        stats = get_diagram_cache().stats()
+        st.caption(f"Cache de diagramas: {stats['hits']} acertos, {stats['misses']} falhas, {stats['entries']} imagens em memória")
     else:
         st.info("Clique em 'Gerar Diagrama e Modelo Lógico' para visualizar e baixar o diagrama.")
 
+# Painel do SQL (re-executa só esta seção)
+@st.fragment
+@timed_section
+def sql_panel():
+    model = st.session_state.model
+    ordered = st.checkbox("Ordenar tabelas por dependência", key="sql_ordered",
+                          help="Agrupa as tabelas em níveis pelas chaves estrangeiras; FKs em ciclo ficam para o fim.")
     if st.button("Gerar SQL"):
-        if not st.session_state.entities:
+        if not model.entities:
             st.error("Adicione pelo menos uma entidade para gerar o SQL.")
         else:
-            sql_script = generate_sql(st.session_state.entities, st.session_state.relationships)
+            if ordered:
+                sql_script = cached_output('sql_ordered_output', lambda: plan_ddl(model).to_sql())
+            else:
+                sql_script = cached_output('sql_output', lambda: generate_sql(model.entities, model.relationships, st.session_state.fragment_memo))
             st.session_state.sql_script = sql_script
             st.subheader("Script SQL")
             st.code(sql_script, language='sql')
@@ -383,4 +500,154 @@ with col2:
         # Se o SQL já foi gerado, exibi-lo
         if 'sql_script' in st.session_state:
             st.subheader("Script SQL")
-            st.code(st.session_state.sql_script, language='sql')
\ No newline at end of file
+            st.code(st.session_state.sql_script, language='sql')
+    with st.expander("🔁 Migração a partir de uma versão anterior"):
+        previous_file = st.file_uploader("Modelo anterior", type=["dfz", "json", "gz"], key="migration_base")
+        if previous_file is not None:
+            try:
+                previous_model = model_from_bytes(previous_file.getvalue())
+            except PersistenceError as e:
+                st.error(str(e))
+            else:
+                migration = generate_migration(previous_model, model)
+                if not migration:
+                    st.info("Nenhuma diferença entre o modelo anterior e o atual.")
+                else:
+                    st.code(migration, language='sql')
+                    st.download_button(
+                        label="🔽 Baixar Migração",
+                        data=migration,
+                        file_name="migracao.sql",
+                        mime="text/plain"
+                    )
+
+with col1:
+    pending = (
+        ('diagram_future' in st.session_state and not st.session_state.diagram_future.done())
+        or any(not future.done() for future in st.session_state.get('area_futures', {}).values())
+    )
+    st.fragment(diagram_panel, run_every=1.0 if pending else None)(polling=pending)
+
+with col2:
+    sql_panel()
+
+# Sessão 4: Normalização
+st.header("4. Normalização")
+st.write("Declare as dependências funcionais de cada entidade para verificar as formas normais.")
+
+# Explicação opcional sobre Dependências Funcionais
+with st.expander("📖 O que é uma Dependência Funcional?"):
+    st.write("""
+    Uma **dependência funcional** `X → Y` indica que os valores dos atributos `X` determinam os valores de `Y`.
+    Exemplo: em **Pedido**, `cliente → nome_cliente`.
+
+    **Formas Normais:**
+    - **2FN:** nenhum atributo não-chave depende de parte de uma chave candidata.
+    - **3FN:** nenhum atributo não-chave depende de outro atributo não-chave.
+    - **BCNF:** todo determinante é uma superchave.
+    """)
+
+# Análise de normalização guardada por entidade e reaproveitada enquanto a versão da entidade não muda
+def normalization_report(entity):
+    reports = st.session_state.setdefault('normalization_reports', {})
+    model = st.session_state.model
+    for name in [name for name in reports if name not in model.entities]:
+        del reports[name]
+    cached = reports.get(entity.name)
+    if cached is None or cached[0] != entity.version:
+        with st.session_state.metrics.timer('normalization_report'):
+            cached = (entity.version, normalize_entity(entity))
+        reports[entity.name] = cached
+    return cached[1]
+
+# Editor de dependências funcionais e análise da entidade (re-executa só esta seção)
+@st.fragment
+@timed_section
+def normalization_section():
+    model = st.session_state.model
+    if not model.entities:
+        st.info("Adicione entidades e atributos para declarar dependências funcionais.")
+        return
+    entity_name = st.selectbox("Entidade", list(model.entities.keys()), key="fd_entity")
+    entity = model.entities[entity_name]
+    columns = entity_columns(entity)
+    with st.form("fd_form", clear_on_submit=True):
+        lhs = st.multiselect("Determinante (lado esquerdo)", columns)
+        rhs = st.multiselect("Atributos determinados (lado direito)", columns)
+        submitted_fd = st.form_submit_button("Adicionar Dependência")
+        if submitted_fd:
+            try:
+                model.add_functional_dependency(entity_name, lhs, rhs)
+            except ModelError as e:
+                st.warning(str(e))
+            else:
+                st.session_state.normalization_message = f"Dependência adicionada à entidade '{entity_name}'."
+                # A dependência muda o modelo salvo e o botão de desfazer: rerun completo
+                st.rerun()
+    if 'normalization_message' in st.session_state:
+        st.success(st.session_state.pop('normalization_message'))
+
+    if entity.functional_dependencies:
+        st.subheader(f"Dependências Funcionais de '{entity_name}':")
+        for fd in entity.functional_dependencies:
+            st.markdown(f"`{', '.join(fd.lhs) or '∅'}` → `{', '.join(fd.rhs)}`")
+
+        report = normalization_report(entity)
+        st.markdown("**Chaves candidatas:** " + "; ".join(f"({', '.join(key)})" for key in report.candidate_keys))
+        st.markdown("**Cobertura mínima:** " + "; ".join(f"{', '.join(fd.lhs) or '∅'} → {', '.join(fd.rhs)}" for fd in report.minimal_cover))
+        st.markdown(f"**Forma normal atual:** {report.normal_form}")
+        for violation in report.violations:
+            st.warning(f"Violação da {violation.normal_form}: {', '.join(violation.lhs)} → {', '.join(violation.rhs)} ({violation.reason})")
+        for label, relations in (("3FN", report.decomposition_3nf), ("BCNF", report.decomposition_bcnf)):
+            if not relations:
+                continue
+            st.markdown(f"**Decomposição proposta ({label}):**")
+            for relation in relations:
+                attrs = ", ".join(f"<u>{name}</u>" if name in relation.key else name for name in relation.attributes)
+                st.markdown(f"- ({attrs})", unsafe_allow_html=True)
+            if st.button(f"Aplicar decomposição {label}", key=f"apply_{label}"):
+                with model_action():
+                    names = apply_decomposition(model, entity_name, relations)
+                st.session_state.normalization_message = f"Entidade '{entity_name}' decomposta em: {', '.join(names)}."
+                # Novas entidades aparecem nas demais seções: rerun completo
+                st.rerun()
+
+normalization_section()
+
+# Painel de desempenho (opcional): tempos desta execução, histórico, caches e memória da sessão
+def performance_panel():
+    metrics = st.session_state.metrics
+    render_metrics = get_render_metrics()
+    st.caption(f"Execução nº {metrics.reruns} desta sessão")
+    st.markdown("**Última execução**")
+    st.dataframe([{"medição": name, "ms": round(seconds * 1000, 1)} for name, seconds in metrics.current], hide_index=True)
+    st.markdown("**Execuções recentes** (inclui os reruns só de fragmentos)")
+    st.dataframe([
+        {"nº": number, "execução": fields.get("fragment", "completa"), "ms": round(seconds * 1000, 1)}
+        for number, _, seconds, fields in metrics.recent_reruns()
+    ], hide_index=True)
+    st.markdown("**Histórico recente (percentis)**")
+    st.dataframe(metrics.summary() + render_metrics.summary(), hide_index=True)
+
+    stats = get_diagram_cache().stats()
+    memo = st.session_state.fragment_memo
+    memo_lookups = memo.hits + memo.misses
+    st.markdown(
+        f"**Caches:** diagramas {stats['hit_rate']:.0%} de acertos ({stats['entries']} imagens, {stats['bytes'] / 1e6:.1f} MB); "
+        f"fragmentos {memo.hits / memo_lookups if memo_lookups else 0:.0%} de acertos"
+    )
+
+    sizes = sorted(((str(key), estimate_size(value)) for key, value in st.session_state.items()), key=lambda item: -item[1])
+    st.markdown(f"**Memória da sessão:** {sum(size for _, size in sizes) / 1e6:.2f} MB")
+    st.dataframe([{"chave": key, "KB": round(size / 1024, 1)} for key, size in sizes[:10]], hide_index=True)
+    st.download_button(
+        label="🔽 Exportar Métricas (JSON Lines)",
+        data=metrics.export_jsonl() + render_metrics.export_jsonl(),
+        file_name="metricas.jsonl",
+        mime="application/x-ndjson"
+    )
+
+st.session_state.metrics.finish_rerun()
+with st.sidebar:
+    if st.toggle("📊 Painel de desempenho", key="performance_panel"):
+        performance_panel()
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from diagrama_facil.ddl_plan import ApplyError, apply_plan, dependency_levels, plan_ddl, sqlite_connector
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.schema_diff import schema_from_model
+
+
+def add_table(model, name, references=()):
+    model.add_entity(name)
+    model.add_attribute(name, Attribute(f"id_{name.lower()}", "NUMBER", is_primary_key=True))
+    for target in references:
+        model.add_attribute(name, Attribute(target.lower(), "NUMBER", is_foreign_key=True, references=target, referenced_attr=f"id_{target.lower()}"))
+
+
+def store_model():
+    model = ERModel()
+    add_table(model, "Item", ["Pedido", "Produto"])
+    add_table(model, "Pedido", ["Cliente"])
+    add_table(model, "Cliente")
+    add_table(model, "Produto", ["Categoria"])
+    add_table(model, "Categoria")
+    model.add_relationship(Relationship("Cliente", "Produto", "favorita", "N:N", "Parcial", "Parcial"))
+    return model
+
+
+def cycle_model():
+    # A -> B -> C -> A, com D dependendo do ciclo e E independente
+    model = ERModel()
+    add_table(model, "A", ["B"])
+    add_table(model, "B", ["C"])
+    add_table(model, "C", ["A"])
+    add_table(model, "D", ["A"])
+    add_table(model, "E")
+    return model
+
+
+def test_levels_follow_foreign_keys_in_model_order():
+    levels, deferred = dependency_levels(schema_from_model(store_model()))
+    assert levels == [["Cliente", "Categoria"], ["Pedido", "Produto"], ["Item", "Cliente_Produto"]]
+    assert deferred == []
+
+
+def test_cycle_is_deferred_as_one_component():
+    levels, deferred = dependency_levels(schema_from_model(cycle_model()))
+    assert levels == [["A", "B", "C", "E"], ["D"]]
+    assert sorted((name, fk.ref_table) for name, fk in deferred) == [("A", "B"), ("B", "C"), ("C", "A")]
+
+
+def test_oracle_waves_add_deferred_keys_last():
+    plan = plan_ddl(cycle_model())
+    waves = plan.waves
+    assert len(waves) == 3
+    assert sum(sql.startswith("CREATE SEQUENCE") for sql in waves[0]) == 5
+    assert [sql.split()[2] for sql in waves[0] if sql.startswith("CREATE TABLE")] == ["A", "B", "C", "E"]
+    assert [sql.split()[2] for sql in waves[1]] == ["D"]
+    assert waves[2] == [
+        "ALTER TABLE A ADD CONSTRAINT fk_A_b FOREIGN KEY (b) REFERENCES B(id_b) DEFERRABLE INITIALLY DEFERRED;",
+        "ALTER TABLE B ADD CONSTRAINT fk_B_c FOREIGN KEY (c) REFERENCES C(id_c) DEFERRABLE INITIALLY DEFERRED;",
+        "ALTER TABLE C ADD CONSTRAINT fk_C_a FOREIGN KEY (a) REFERENCES A(id_a) DEFERRABLE INITIALLY DEFERRED;",
+    ]
+    # As FKs do ciclo não aparecem também dentro do CREATE TABLE
+    assert "REFERENCES" not in waves[0][-4]
+
+
+def foreign_keys(connection, table):
+    return {(row[3], row[2]) for row in connection.execute(f"PRAGMA foreign_key_list({table})")}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_apply_plan_creates_sqlite_schema(tmp_path, workers):
+    path = str(tmp_path / "banco.db")
+    model = cycle_model()
+    timings = apply_plan(plan_ddl(model, "sqlite"), sqlite_connector(path), workers, begin="BEGIN IMMEDIATE")
+    assert [t.statements for t in timings] == [4, 1]
+    connection = sqlite3.connect(path)
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert tables == set(schema_from_model(model).tables)
+        assert foreign_keys(connection, "C") == {("a", "A")}
+        assert foreign_keys(connection, "D") == {("a", "A")}
+    finally:
+        connection.close()
+
+
+def test_apply_plan_reports_failing_wave(tmp_path):
+    path = str(tmp_path / "banco.db")
+    plan = plan_ddl(store_model(), "sqlite")
+    apply_plan(plan, sqlite_connector(path))
+    # Aplicar de novo falha já na primeira etapa: as tabelas existem
+    with pytest.raises(ApplyError, match="etapa 0"):
+        apply_plan(plan, sqlite_connector(path))
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+
+from diagrama_facil.ddl_plan import plan_ddl
+from diagrama_facil.generators import generate_sql
+from diagrama_facil.importer import SchemaImportError, import_stream, iter_statements, parse_oracle_ddl
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.schema_diff import diff_schemas, schema_from_model
+
+
+def sample_model():
+    model = ERModel()
+    for name in ("Cliente", "Pedido", "Produto", "Categoria"):
+        model.add_entity(name)
+        model.add_attribute(name, Attribute(f"id_{name.lower()}", "NUMBER", is_primary_key=True))
+    model.add_attribute("Cliente", Attribute("nome", "VARCHAR2(255)"))
+    model.add_attribute("Cliente", Attribute("email", "VARCHAR2(100)", is_multivalued=True))
+    model.add_attribute("Produto", Attribute("categoria", "NUMBER", is_foreign_key=True, references="Categoria", referenced_attr="id_categoria"))
+    model.add_relationship(Relationship("Cliente", "Pedido", "realiza", "1:N", "Total", "Parcial"))
+    model.add_relationship(Relationship("Pedido", "Produto", "contém", "N:N", "Total", "Total"))
+    return model
+
+
+@pytest.mark.parametrize("script", [
+    lambda model: generate_sql(model.entities, model.relationships),
+    lambda model: plan_ddl(model).to_sql(),
+], ids=["generate_sql", "plan_ddl"])
+def test_generated_ddl_round_trips(script):
+    model = sample_model()
+    imported, report = import_stream(io.StringIO(script(model)), "sql")
+    assert diff_schemas(schema_from_model(model), schema_from_model(imported)).statements == []
+    assert report.entities == 4 and report.relationships == 2
+    assert [a.name for a in imported.entities["Cliente"].attributes if a.is_multivalued] == ["email"]
+
+
+def test_statements_ignore_comments_and_literals():
+    script = [
+        "-- comentário; com ponto e vírgula\n",
+        "CREATE TABLE t (a VARCHAR2(10) DEFAULT 'x;y', /* b; */ c NUMBER);\n",
+        "CREATE SEQUENCE s;",
+    ]
+    statements = list(iter_statements(script))
+    assert len(statements) == 2
+    assert "'x;y'" in statements[0] and "b;" not in statements[0]
+
+
+def test_parse_oracle_ddl_constraints():
+    schema = parse_oracle_ddl(io.StringIO(
+        'CREATE TABLE "HR"."DEPT" (ID NUMBER(10) NOT NULL, NOME VARCHAR2(50) UNIQUE, CONSTRAINT PK_DEPT PRIMARY KEY (ID));\n'
+        "CREATE TABLE EMP (ID NUMBER PRIMARY KEY, DEPT_ID NUMBER REFERENCES DEPT(ID));\n"
+        "ALTER TABLE EMP ADD CONSTRAINT FK_CHEFE FOREIGN KEY (CHEFE) REFERENCES EMP (ID);\n"
+    ))
+    dept, emp = schema.tables["DEPT"], schema.tables["EMP"]
+    assert dept.primary_key == ("ID",) and dept.columns["NOME"].unique
+    assert dept.columns["ID"].data_type == "NUMBER(10)"
+    assert emp.primary_key == ("ID",)
+    assert [(fk.columns, fk.ref_table, fk.name) for fk in emp.foreign_keys] == [(("DEPT_ID",), "DEPT", None), (("CHEFE",), "EMP", "FK_CHEFE")]
+
+
+def test_csv_catalog():
+    catalog = (
+        "table_name;column_name;data_type;data_length;data_precision;is_primary_key;references_table;references_column\n"
+        "Cliente;id;NUMBER;;10;Y;;\n"
+        "Cliente;nome;VARCHAR2;80;;;;\n"
+        "Pedido;id;NUMBER;;;Y;;\n"
+        "Pedido;comprador;NUMBER;;;;Cliente;id\n"
+    )
+    model, report = import_stream(io.StringIO(catalog, newline=""), "csv")
+    assert report.tables == 2 and report.columns == 4
+    cliente = {a.name: a for a in model.entities["Cliente"].attributes}
+    assert cliente["id"].data_type == "NUMBER(10)" and cliente["id"].is_primary_key
+    assert cliente["nome"].data_type == "VARCHAR2(80)"
+    fk = next(a for a in model.entities["Pedido"].attributes if a.name == "comprador")
+    assert fk.is_foreign_key and (fk.references, fk.referenced_attr) == ("Cliente", "id")
+
+
+def test_json_catalog_list_and_lines_agree():
+    rows = [
+        '{"tabela": "Cliente", "coluna": "id", "tipo": "NUMBER", "pk": "sim"}',
+        '{"tabela": "Cliente", "coluna": "nome", "tipo": "VARCHAR2(80)"}',
+    ]
+    as_list, _ = import_stream(io.StringIO("[" + ",\n".join(rows) + "]"), "json")
+    as_lines, _ = import_stream(io.StringIO("\n".join(rows) + "\n"), "json")
+    assert diff_schemas(schema_from_model(as_list), schema_from_model(as_lines)).statements == []
+    assert [a.name for a in as_list.entities["Cliente"].attributes] == ["id", "nome"]
+
+
+@pytest.mark.parametrize("kind, content", [
+    ("sql", "CREATE TABLE t (a NUMBER, FOREIGN KEY (a));"),
+    ("sql", "CREATE TABLE t (a NUMBER, CONSTRAINT c UNIQUE);"),
+    ("csv", "table_name,column_name,data_type\nCliente,,NUMBER\n"),
+    ("json", '[{"table": "Cliente", "column": "id"'),
+])
+def test_invalid_input_raises_import_error(kind, content):
+    with pytest.raises(SchemaImportError):
+        import_stream(io.StringIO(content), kind)
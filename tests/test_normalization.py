@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+from diagrama_facil.generators import generate_sql
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.normalization import FDSet, apply_decomposition, decompose_bcnf, normalize_entity, synthesize_3nf
+
+
+# Fecho por ponto fixo, direto da definição
+def brute_closure(fds, mask):
+    result = mask
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in fds:
+            if lhs & ~result == 0 and rhs & ~result:
+                result |= rhs
+                changed = True
+    return result
+
+
+# Chaves candidatas por enumeração de todos os subconjuntos
+def brute_keys(fds, n, within):
+    superkeys = [mask for mask in range(1 << n) if mask & ~within == 0 and brute_closure(fds, mask) & within == within]
+    return {key for key in superkeys if not any(other != key and other & ~key == 0 for other in superkeys)}
+
+
+def random_fdsets(count=200, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(1, 7)
+        fds = []
+        for _ in range(rng.randint(0, 8)):
+            lhs = rng.getrandbits(n) & rng.getrandbits(n)
+            rhs = rng.getrandbits(n) or 1
+            fds.append((lhs, rhs))
+        yield FDSet([f"a{i}" for i in range(n)], fds)
+
+
+def equivalent(a, b):
+    return all(a.closure(mask) == b.closure(mask) for mask in range(a.all + 1))
+
+
+def test_closure_matches_fixpoint():
+    for fdset in random_fdsets():
+        for mask in range(fdset.all + 1):
+            assert fdset.closure(mask) == brute_closure(fdset.fds, mask)
+
+
+def test_minimal_cover_is_equivalent_and_minimal():
+    for fdset in random_fdsets():
+        cover = fdset.minimal_cover()
+        assert equivalent(fdset, cover)
+        for i, (lhs, rhs) in enumerate(cover.fds):
+            assert rhs & (rhs - 1) == 0 and rhs & ~lhs
+            # Nenhum atributo do lado esquerdo é estranho
+            for a in range(len(fdset.attributes)):
+                if lhs >> a & 1:
+                    assert not cover.closure(lhs & ~(1 << a)) & rhs
+            # Nenhuma dependência é redundante
+            assert not cover.closure(lhs, skip=i) & rhs
+
+
+def test_candidate_keys_match_brute_force():
+    for fdset in random_fdsets():
+        n = len(fdset.attributes)
+        assert set(fdset.candidate_keys()) == brute_keys(fdset.fds, n, fdset.all)
+        # Numa projeção, minimize_key devolve uma das chaves da relação projetada
+        within = fdset.all & ~1 if n > 1 else fdset.all
+        assert fdset.minimize_key(within, within) in brute_keys(fdset.fds, n, within)
+
+
+def test_decompositions_are_lossless_with_valid_keys():
+    for fdset in random_fdsets():
+        keys = fdset.candidate_keys()
+        for relations in (synthesize_3nf(fdset, keys), decompose_bcnf(fdset)):
+            covered = 0
+            for relation in relations:
+                attrs = fdset.mask(relation.attributes)
+                key = fdset.mask(relation.key)
+                covered |= attrs
+                assert key & ~attrs == 0 and fdset.is_superkey(key, attrs)
+                assert all(not fdset.is_superkey(key & ~(1 << a), attrs) for a in range(len(fdset.attributes)) if key >> a & 1)
+            assert covered == fdset.all
+            # Alguma relação contém uma superchave da relação original (junção sem perdas)
+            assert any(fdset.is_superkey(fdset.mask(relation.attributes)) for relation in relations)
+
+
+def model_with(attributes, fds, model=None):
+    model = model or ERModel()
+    model.add_entity("R")
+    for name in attributes:
+        model.add_attribute("R", Attribute(name, "NUMBER", is_primary_key=name == attributes[0]))
+    for lhs, rhs in fds:
+        model.add_functional_dependency("R", lhs, rhs)
+    return model
+
+
+def test_transitive_dependency_report():
+    model = model_with(["A", "B", "C"], [(["A"], ["B"]), (["B"], ["C"])])
+    report = normalize_entity(model.entities["R"])
+    assert report.candidate_keys == [("A",)]
+    assert report.normal_form == "2FN"
+    assert [(v.normal_form, v.lhs, v.rhs) for v in report.violations] == [("3FN", ("B",), ("C",))]
+    assert sorted((r.attributes, r.key) for r in report.decomposition_3nf) == [(("A", "B"), ("A",)), (("B", "C"), ("B",))]
+
+
+def test_apply_decomposition_keeps_entity_name():
+    model = model_with(["A", "B", "C"], [(["A"], ["B"]), (["B"], ["C"])])
+    report = normalize_entity(model.entities["R"])
+    names = apply_decomposition(model, "R", report.decomposition_3nf)
+    assert "R" in names and len(names) == 2
+    assert sorted(attr.name for attr in model.entities["R"].attributes) == ["A", "B"]
+
+
+def test_declared_primary_key_determines_all_columns():
+    # Sem a PK como dependência, a chave seria (id, cliente, data) e a decomposição trocaria a PK de Pedido
+    model = ERModel()
+    model.add_entity("Cliente")
+    model.add_attribute("Cliente", Attribute("id_cliente", "NUMBER", is_primary_key=True))
+    model = model_with(["id", "cliente", "nome_cliente", "data"], [(["cliente"], ["nome_cliente"])], model)
+    model.add_relationship(Relationship("R", "Cliente", "faz", "1:N", "Total", "Total"))
+    report = normalize_entity(model.entities["R"])
+    assert report.candidate_keys == [("id",)]
+    assert report.normal_form == "2FN"
+    assert [(v.normal_form, v.lhs, v.rhs) for v in report.violations] == [("3FN", ("cliente",), ("nome_cliente",))]
+
+    apply_decomposition(model, "R", report.decomposition_3nf)
+    entity = model.entities["R"]
+    assert [attr.name for attr in entity.pk_attributes] == ["id"]
+    assert not entity.is_weak
+    assert "REFERENCES R(id)" in generate_sql(model.entities, model.relationships)
+
+
+def test_composite_key_relation_is_not_marked_weak():
+    model = ERModel()
+    model.add_entity("R")
+    for name in "ABCD":
+        model.add_attribute("R", Attribute(name, "NUMBER"))
+    model.add_functional_dependency("R", ["A", "B"], ["C"])
+    model.add_functional_dependency("R", ["C"], ["D"])
+    apply_decomposition(model, "R", normalize_entity(model.entities["R"]).decomposition_3nf)
+    entity = model.entities["R"]
+    assert [attr.name for attr in entity.pk_attributes] == ["A", "B"]
+    assert not entity.is_weak
+    assert "PRIMARY KEY (A, B)" in generate_sql(model.entities, model.relationships)
+
+
+@pytest.mark.parametrize("n", [12, 16])
+def test_candidate_keys_scale_polynomially(n):
+    # Cadeia cíclica a_i -> a_(i+1): cada atributo sozinho é chave; a enumeração de subconjuntos seria 2^n
+    names = [f"a{i}" for i in range(n)]
+    fdset = FDSet(names, [([names[i]], [names[(i + 1) % n]]) for i in range(n)])
+    assert sorted(fdset.candidate_keys()) == sorted(1 << i for i in range(n))
+    assert fdset.minimal_cover().fds == fdset.fds
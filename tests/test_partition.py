@@ -0,0 +1,81 @@
+import random
+
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.partition import area_diagrams, partition_model
+
+
+def add(model, name, supertype=None):
+    model.add_entity(name, supertype=supertype)
+    model.add_attribute(name, Attribute(f"id_{name.lower()}", "NUMBER", is_primary_key=True))
+
+
+def relate(model, a, b):
+    model.add_relationship(Relationship(a, b, f"{a}_{b}", "1:N", "Total", "Parcial"))
+
+
+def random_model(n, seed):
+    rng = random.Random(seed)
+    model = ERModel()
+    for i in range(n):
+        supertype = f"E{rng.randrange(i)}" if i and rng.random() < 0.1 else None
+        add(model, f"E{i}", supertype)
+    pairs = {tuple(rng.sample(range(n), 2)) for _ in range(n * 2)}
+    for a, b in sorted(pairs):
+        relate(model, f"E{a}", f"E{b}")
+    return model
+
+
+def area_of(areas):
+    return {name: area.index for area in areas for name in area.entities}
+
+
+def test_areas_respect_max_size_and_cover_model():
+    for seed in range(20):
+        model = random_model(150, seed)
+        areas = partition_model(model, max_size=25)
+        assert all(len(area.entities) <= 25 for area in areas)
+        assert sorted(name for area in areas for name in area.entities) == sorted(model.entities)
+
+
+def test_generalization_trees_are_not_split():
+    model = random_model(120, 3)
+    add(model, "Pessoa")
+    for name in ("Cliente", "Funcionario", "Fornecedor"):
+        add(model, name, supertype="Pessoa")
+    add(model, "Gerente", supertype="Funcionario")
+    for i in range(0, 120, 7):
+        relate(model, "Cliente", f"E{i}")
+    areas = area_of(partition_model(model, max_size=20))
+    assert {areas[name] for name in ("Pessoa", "Cliente", "Funcionario", "Fornecedor", "Gerente")} == {areas["Pessoa"]}
+    for name, entity in model.entities.items():
+        if entity.supertype:
+            assert areas[name] == areas[entity.supertype]
+
+
+def test_hub_with_many_leaves():
+    model = ERModel()
+    add(model, "Hub")
+    for i in range(100):
+        add(model, f"Folha{i}")
+        relate(model, "Hub", f"Folha{i}")
+    areas = partition_model(model)
+    assert [len(area.entities) for area in areas] == [40, 40, 21]
+    assert areas[0].hub == "Hub"
+
+
+def test_edit_changes_only_its_area():
+    model = ERModel()
+    for prefix in ("Vendas", "Estoque"):
+        for i in range(30):
+            add(model, f"{prefix}{i}")
+            if i:
+                relate(model, f"{prefix}0", f"{prefix}{i}")
+    relate(model, "Vendas1", "Estoque1")
+    before = area_diagrams(model)
+    assert len(before) == 3
+    model.add_attribute("Estoque5", Attribute("quantidade", "NUMBER"))
+    after = area_diagrams(model)
+    assert [title for title, _ in after] == [title for title, _ in before]
+    changed = [title for (title, old), (_, new) in zip(before, after) if old != new]
+    assert changed == ["Área 2: Estoque0"]
+    assert "quantidade" in after[2][1]
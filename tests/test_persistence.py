@@ -0,0 +1,125 @@
+import pytest
+
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.persistence import EditLog, PersistenceError, dump_model, model_from_bytes, model_to_bytes
+
+
+def logged_model(path, **kwargs):
+    log = EditLog(str(path), **kwargs)
+    model = log.replay()
+    model.subscribe(log.record)
+    return log, model
+
+
+def add_entity(log, model, name):
+    with log.action():
+        model.add_entity(name)
+        model.add_attribute(name, Attribute(f"id_{name.lower()}", "NUMBER", is_primary_key=True))
+
+
+def test_action_groups_are_undone_together(tmp_path):
+    log, model = logged_model(tmp_path / "log.jsonl")
+    add_entity(log, model, "Cliente")
+    add_entity(log, model, "Pedido")
+    assert log.undoable == 2
+    log.undo()
+    replayed = log.replay()
+    assert list(replayed.entities) == ["Cliente"]
+    assert [a.name for a in replayed.entities["Cliente"].attributes] == ["id_cliente"]
+
+
+def test_unfinished_group_is_rolled_back(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log, model = logged_model(path)
+    add_entity(log, model, "Cliente")
+    # Queda no meio de uma ação: o "begin" e a primeira operação chegaram ao disco, o "commit" não
+    log._depth = 1
+    model.add_entity("Pedido")
+    log, model = logged_model(path)
+    assert list(model.entities) == ["Cliente"] and log.undoable == 1
+    # Operações novas, mesmo fora de uma ação, não entram no grupo interrompido
+    model.add_entity("Produto")
+    assert list(EditLog(str(path)).replay().entities) == ["Cliente", "Produto"]
+
+
+def test_truncated_last_line_is_repaired(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log, model = logged_model(path)
+    add_entity(log, model, "Cliente")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["begin"]\n["add_entity","Ped')
+    log, model = logged_model(path)
+    assert list(model.entities) == ["Cliente"]
+    add_entity(log, model, "Produto")
+    assert list(EditLog(str(path)).replay().entities) == ["Cliente", "Produto"]
+
+
+def test_corrupted_middle_line_raises(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('["add_entity","Cliente",false,null]\n{quebrado\n["undo"]\n', encoding="utf-8")
+    with pytest.raises(PersistenceError):
+        EditLog(str(path)).replay()
+
+
+def test_undo_survives_replay(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log, model = logged_model(path)
+    for name in ("Cliente", "Pedido", "Produto"):
+        add_entity(log, model, name)
+    log.undo()
+    # Nova sessão: o desfazer anterior continua valendo e as ações restantes podem ser desfeitas
+    log, model = logged_model(path)
+    assert list(model.entities) == ["Cliente", "Pedido"] and log.undoable == 2
+    log.undo()
+    assert list(log.replay().entities) == ["Cliente"]
+
+
+def test_checkpoint_is_the_new_base(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log, model = logged_model(path)
+    add_entity(log, model, "Cliente")
+    imported = ERModel()
+    imported.add_entity("Fornecedor")
+    log.checkpoint(imported)
+    assert log.undoable == 0
+    log.undo()
+    assert list(log.replay().entities) == ["Fornecedor"]
+
+
+def test_replay_compacts_long_logs(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log, model = logged_model(path, compact_after=20, keep_actions=3)
+    names = [f"E{i}" for i in range(10)]
+    for name in names:
+        add_entity(log, model, name)
+    before = dump_model(model)
+    replayed = log.replay()
+    assert dump_model(replayed) == before
+    assert log.undoable == 3
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1 + 3 * 4
+    log.undo()
+    assert list(log.replay().entities) == names[:-1]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_model_bytes_round_trip(compress):
+    model = ERModel()
+    model.add_entity("Pessoa")
+    model.add_entity("Cliente", supertype="Pessoa")
+    model.add_entity("Dependente", is_weak=True)
+    model.add_attribute("Pessoa", Attribute("id_pessoa", "NUMBER", is_primary_key=True))
+    model.add_attribute("Pessoa", Attribute("telefone", "VARCHAR2(20)", is_multivalued=True))
+    model.add_attribute("Pessoa", Attribute("idade", "NUMBER", is_derived=True))
+    model.add_attribute("Cliente", Attribute("indicado_por", "NUMBER", is_foreign_key=True, references="Pessoa", referenced_attr="id_pessoa"))
+    model.add_functional_dependency("Pessoa", ["id_pessoa"], ["idade"])
+    model.add_relationship(Relationship("Pessoa", "Dependente", "possui", "1:N", "Parcial", "Total"))
+    data = model_to_bytes(model, compress)
+    assert (data[:2] == b"\x1f\x8b") == compress
+    assert dump_model(model_from_bytes(data)) == dump_model(model)
+
+
+def test_model_from_bytes_rejects_garbage():
+    with pytest.raises(PersistenceError):
+        model_from_bytes(b"\x1f\x8b nao e gzip")
+    with pytest.raises(PersistenceError):
+        model_from_bytes(b'{"format": "outro"}')
@@ -0,0 +1,110 @@
+from diagrama_facil.generators import generate_sql
+from diagrama_facil.model import Attribute, ERModel, Relationship
+from diagrama_facil.persistence import dump_model, load_model
+from diagrama_facil.schema_diff import diff_schemas, generate_migration, schema_from_model
+
+
+def sample_model():
+    model = ERModel()
+    for name in ("Cliente", "Pedido", "Produto"):
+        model.add_entity(name)
+        model.add_attribute(name, Attribute(f"id_{name.lower()}", "NUMBER", is_primary_key=True))
+    model.add_attribute("Cliente", Attribute("nome", "VARCHAR2(255)"))
+    model.add_attribute("Cliente", Attribute("telefone", "VARCHAR2(20)", is_multivalued=True))
+    model.add_attribute("Pedido", Attribute("produto", "NUMBER", is_foreign_key=True, references="Produto", referenced_attr="id_produto"))
+    model.add_relationship(Relationship("Cliente", "Pedido", "realiza", "1:N", "Total", "Parcial"))
+    model.add_relationship(Relationship("Pedido", "Produto", "contém", "N:N", "Total", "Total"))
+    return model
+
+
+def copy_model(model):
+    return load_model(dump_model(model))
+
+
+def test_same_model_has_empty_migration():
+    model = sample_model()
+    diff = diff_schemas(schema_from_model(model), schema_from_model(copy_model(model)))
+    assert diff.statements == []
+    assert diff.unchanged_tables == len(schema_from_model(model).tables)
+
+
+def test_schema_from_model_tables():
+    schema = schema_from_model(sample_model())
+    assert set(schema.tables) == {"Cliente", "Cliente_telefone", "Pedido", "Produto", "Pedido_Produto"}
+    pedido = schema.tables["Pedido"]
+    assert pedido.primary_key == ("id_pedido",)
+    assert {(fk.columns, fk.ref_table) for fk in pedido.foreign_keys} == {(("produto",), "Produto"), (("Cliente_id",), "Cliente")}
+    assert schema.tables["Pedido_Produto"].primary_key == ("Pedido_id", "Produto_id")
+
+
+def test_new_entity_creates_table_and_sequence():
+    old = sample_model()
+    new = copy_model(old)
+    new.add_entity("Fornecedor")
+    new.add_attribute("Fornecedor", Attribute("id_fornecedor", "NUMBER", is_primary_key=True))
+    statements = diff_schemas(schema_from_model(old), schema_from_model(new)).statements
+    assert statements[0].startswith("CREATE SEQUENCE Fornecedor_id_fornecedor_seq")
+    assert statements[1].startswith("CREATE TABLE Fornecedor (")
+    assert len(statements) == 2
+
+
+def test_changed_column_only_touches_its_table():
+    old = sample_model()
+    new = copy_model(old)
+    attributes = [Attribute(a.name, "VARCHAR2(100)" if a.name == "nome" else a.data_type, is_primary_key=a.is_primary_key,
+                            is_multivalued=a.is_multivalued) for a in new.entities["Cliente"].attributes]
+    new.set_attributes("Cliente", attributes)
+    diff = diff_schemas(schema_from_model(old), schema_from_model(new))
+    assert diff.statements == ["ALTER TABLE Cliente MODIFY (nome VARCHAR2(100));"]
+    assert diff.unchanged_tables == 4
+
+
+def test_removed_foreign_key_is_dropped_by_name():
+    old = sample_model()
+    new = copy_model(old)
+    attributes = [a for a in new.entities["Pedido"].attributes if a.name != "produto"]
+    attributes.append(Attribute("produto", "NUMBER"))
+    new.set_attributes("Pedido", attributes)
+    assert generate_migration(old, new) == "ALTER TABLE Pedido DROP CONSTRAINT fk_Pedido_produto;"
+
+
+def test_generated_script_uses_migration_constraint_names():
+    model = sample_model()
+    script = generate_sql(model.entities, model.relationships)
+    for table in schema_from_model(model).tables.values():
+        for fk in table.foreign_keys:
+            assert f"CONSTRAINT {fk.constraint_name(table.name)} FOREIGN KEY ({', '.join(fk.columns)})" in script
+
+
+def test_primary_key_change_cascades_and_restores_foreign_keys():
+    old = sample_model()
+    new = copy_model(old)
+    new.set_attributes("Cliente", [
+        Attribute("id_cliente", "NUMBER"),
+        Attribute("cpf", "CHAR(11)", is_primary_key=True),
+        Attribute("nome", "VARCHAR2(255)"),
+        Attribute("telefone", "VARCHAR2(20)", is_multivalued=True),
+    ])
+    statements = generate_migration(old, new).splitlines()
+    assert "ALTER TABLE Cliente DROP PRIMARY KEY CASCADE;" in statements
+    add_pk = statements.index("ALTER TABLE Cliente ADD CONSTRAINT pk_Cliente PRIMARY KEY (cpf);")
+    assert statements.index("ALTER TABLE Cliente DROP PRIMARY KEY CASCADE;") < add_pk
+    # As FKs que apontavam para a PK antiga caíram com o CASCADE e voltam apontando para a nova
+    restored = [s for s in statements[add_pk:] if "REFERENCES Cliente(" in s]
+    assert sorted(restored) == [
+        "ALTER TABLE Cliente_telefone ADD CONSTRAINT fk_Cliente_telefone_Cliente_id FOREIGN KEY (Cliente_id) REFERENCES Cliente(cpf);",
+        "ALTER TABLE Pedido ADD CONSTRAINT fk_Pedido_Cliente FOREIGN KEY (Cliente_id) REFERENCES Cliente(cpf);",
+    ]
+
+
+def test_dropped_entity_drops_table_and_sequence():
+    old = sample_model()
+    new = ERModel()
+    new.add_entity("Cliente")
+    new.set_attributes("Cliente", [Attribute(a.name, a.data_type, is_primary_key=a.is_primary_key, is_multivalued=a.is_multivalued)
+                                   for a in old.entities["Cliente"].attributes])
+    statements = generate_migration(old, new).splitlines()
+    assert "DROP TABLE Pedido CASCADE CONSTRAINTS;" in statements
+    assert "DROP TABLE Pedido_Produto CASCADE CONSTRAINTS;" in statements
+    assert "DROP SEQUENCE Produto_id_produto_seq;" in statements
+    assert not any("Cliente" in s for s in statements)